@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecommerce.settings")
 
 application = get_wsgi_application()
+
+# Load the category listing (and its slug map) and the product search
+# index before the first request
+from store.categories import category_listing  # noqa: E402
+from store.search import product_search_index  # noqa: E402
+
+category_listing.warm()
+product_search_index.warm()
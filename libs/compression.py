@@ -0,0 +1,139 @@
+"""
+Response body compression.
+
+gzip is always available. brotli is used when the ``brotli`` (or
+``brotlicffi``) package is installed, and preferred over gzip when the
+client accepts both. Streams are flushed after every chunk, so a client
+can decode each chunk as soon as it arrives instead of waiting for the
+compressor's buffer to fill.
+"""
+import io
+import secrets
+import zlib
+from gzip import GzipFile
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+
+GZIP_LEVEL = 6
+# 11 is meant for static assets; 5 compresses about as fast as gzip, and smaller
+BROTLI_QUALITY = 5
+
+# Random-length gzip file name, as Django's GZipMiddleware does, to make
+# BREACH-style length guessing harder
+MAX_RANDOM_BYTES = 100
+
+COMPRESSIBLE_TYPES = (
+    "application/javascript",
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class GzipEncoder:
+    def __init__(self):
+        self._buffer = io.BytesIO()
+        filename = secrets.token_hex(secrets.randbelow(MAX_RANDOM_BYTES // 2)) + ".gz"
+        self._file = GzipFile(
+            filename=filename, mode="wb", compresslevel=GZIP_LEVEL, fileobj=self._buffer, mtime=0
+        )
+
+    def _read(self):
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def process(self, data):
+        self._file.write(data)
+        return self._read()
+
+    def flush(self):
+        self._file.flush(zlib.Z_SYNC_FLUSH)
+        return self._read()
+
+    def finish(self):
+        self._file.close()
+        return self._read()
+
+
+class BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def process(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+# Content-Encoding values in order of preference
+ENCODERS = {"br": BrotliEncoder, "gzip": GzipEncoder} if brotli else {"gzip": GzipEncoder}
+
+
+def negotiate(accept_encoding):
+    """
+    The encoding in ENCODERS the ``Accept-Encoding`` header gives the
+    highest weight, preferring the earlier one on ties, or None.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in ENCODERS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def is_compressible(content_type):
+    media_type = content_type.split(";")[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+def compress(data, encoding):
+    encoder = ENCODERS[encoding]()
+    return encoder.process(data) + encoder.finish()
+
+
+def compress_stream(chunks, encoding):
+    encoder = ENCODERS[encoding]()
+    for chunk in chunks:
+        if chunk:
+            yield encoder.process(chunk) + encoder.flush()
+    yield encoder.finish()
+
+
+async def acompress_stream(chunks, encoding):
+    encoder = ENCODERS[encoding]()
+    async for chunk in chunks:
+        if chunk:
+            yield encoder.process(chunk) + encoder.flush()
+    yield encoder.finish()
@@ -0,0 +1,35 @@
+"""
+SQLite backend tuned for several concurrent writer processes.
+
+On top of Django's backend it reads two extra ``OPTIONS``:
+
+* ``pragmas``: PRAGMAs applied to every new connection, e.g.
+  ``{"journal_mode": "WAL", "synchronous": "NORMAL"}``.
+* ``immediate_transactions``: start ``atomic()`` blocks with
+  ``BEGIN IMMEDIATE`` so a writer takes the write lock up front. A deferred
+  transaction that reads first and writes later can otherwise fail with
+  ``database is locked`` without the busy timeout ever being waited on.
+
+The busy timeout itself is sqlite3's own ``timeout`` option, in seconds.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = kwargs.pop("pragmas", {})
+        self.immediate_transactions = kwargs.pop("immediate_transactions", False)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.immediate_transactions:
+            self.cursor().execute("BEGIN IMMEDIATE")
+        else:
+            super()._start_transaction_under_autocommit()
@@ -0,0 +1,96 @@
+"""
+Fast JSON encoding for API responses.
+
+``dumps()`` encodes with orjson when it is installed and falls back to the
+standard library otherwise. Both produce the same bytes as DRF's
+JSONRenderer, apart from how orjson spells float exponents (``1e16``).
+Values DRF's encoder knows about (decimals, lazy strings, querysets...)
+are converted the same way.
+
+Already encoded JSON can be wrapped in RawJSON and placed anywhere in a
+payload, e.g. a cached product blob inside the response envelope; it is
+spliced into the output as-is instead of being decoded and encoded again.
+"""
+import json
+import re
+import uuid
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class RawJSON:
+    """A pre-encoded JSON value (bytes or str) to embed in a payload."""
+    __slots__ = ("encoded",)
+
+    def __init__(self, encoded):
+        self.encoded = encoded.encode() if isinstance(encoded, str) else encoded
+
+    def __repr__(self):
+        return f"RawJSON({self.encoded[:40]!r})"
+
+
+_encoder = JSONEncoder()
+
+# Decimals and the other DRF extras go through the default hook
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+# Native fragments need orjson 3.9.13 or later
+FRAGMENT = getattr(orjson, "Fragment", None)
+
+
+def _escape_separators(encoded):
+    # Like DRF, keep the output a strict JavaScript subset
+    if b"\xe2\x80\xa8" in encoded or b"\xe2\x80\xa9" in encoded:
+        encoded = encoded.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return encoded
+
+
+def dumps(data, indent=None):
+    """Encode ``data`` to compact (or ``indent``-ed) UTF-8 JSON bytes."""
+    fragments = []
+    marker = None
+
+    def default(value):
+        nonlocal marker
+        if isinstance(value, RawJSON):
+            if FRAGMENT is not None and indent is None:
+                return FRAGMENT(value.encoded)
+            # Encoded as a unique placeholder string, replaced afterwards
+            if marker is None:
+                marker = uuid.uuid4().hex
+            fragments.append(value.encoded)
+            return f"{marker}:{len(fragments) - 1}"
+        return _encoder.default(value)
+
+    if orjson is not None and indent is None:
+        encoded = orjson.dumps(data, default=default, option=ORJSON_OPTIONS)
+    else:
+        encoded = json.dumps(
+            data,
+            default=default,
+            indent=indent,
+            ensure_ascii=False,
+            separators=(",", ":") if indent is None else (",", ": "),
+        ).encode()
+
+    if fragments:
+        placeholder = re.compile(b'"' + marker.encode() + rb':(\d+)"')
+        encoded = placeholder.sub(lambda match: fragments[int(match.group(1))], encoded)
+    return _escape_separators(encoded)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer using dumps(): orjson when available, and RawJSON
+    fragments spliced in without re-encoding.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return dumps(data, indent=self.get_indent(accepted_media_type, renderer_context or {}))
@@ -1,15 +1,80 @@
+import uuid
+
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework.response import Response
 
+from libs.renderers import RawJSON, dumps
+
+
+def format_response(data=None, message="", success=True, errors=None):
+    return {
+        "success": success,
+        "message": message,
+        "errors": errors or {"code": None, "message": None, "errors": []},
+        "data": data or {},
+    }
+
 
 class APIResponse(Response):
 
     def __init__(
         self, data=None, message="", success=True, status_code=200, errors=None
     ):
-        formatted_response = {
-            "success": success,
-            "message": message,
-            "errors": errors or {"code": None, "message": None, "errors": []},
-            "data": data or {},
-        }
+        formatted_response = format_response(data, message, success, errors)
         super().__init__(data=formatted_response, status=status_code)
+
+
+class APIJsonResponse(HttpResponse):
+    """
+    Same envelope, encoded the same way, as APIResponse for plain Django
+    (e.g. async) views that don't go through DRF's renderers.
+    """
+
+    def __init__(
+        self, data=None, message="", success=True, status_code=200, errors=None
+    ):
+        formatted_response = format_response(data, message, success, errors)
+        super().__init__(
+            dumps(formatted_response), status=status_code, content_type="application/json"
+        )
+
+
+class StreamingAPIResponse(StreamingHttpResponse):
+    """
+    The same envelope as APIResponse, encoded as it is sent. ``data[key]``
+    is a list built from ``chunks``, an iterable or async iterable of lists
+    of items, so the whole list is never held in memory; ``extra`` are the
+    other ``data`` entries. Once the first chunk is sent errors can't be
+    reported, so validate the request before building the response.
+    """
+
+    def __init__(self, key, chunks, message="", extra=None, status_code=200):
+        marker = f'"{uuid.uuid4().hex}"'.encode()
+        envelope = dumps(format_response({key: RawJSON(marker), **(extra or {})}, message))
+        head, tail = envelope.split(marker)
+        if hasattr(chunks, "__aiter__"):
+            content = self._aencode(head, chunks, tail)
+        else:
+            content = self._encode(head, chunks, tail)
+        super().__init__(content, status=status_code, content_type="application/json")
+
+    @staticmethod
+    def _encode(head, chunks, tail):
+        yield head + b"["
+        separator = b""
+        for items in chunks:
+            if items:
+                # The items without the list's brackets
+                yield separator + dumps(items)[1:-1]
+                separator = b","
+        yield b"]" + tail
+
+    @staticmethod
+    async def _aencode(head, chunks, tail):
+        yield head + b"["
+        separator = b""
+        async for items in chunks:
+            if items:
+                yield separator + dumps(items)[1:-1]
+                separator = b","
+        yield b"]" + tail
@@ -1,4 +1,10 @@
+import itertools
+
 from django.db import models
+from django.utils.text import slugify
+
+# Room kept for a "-<n>" collision suffix
+SLUG_SUFFIX_LENGTH = 11
 
 class AbstractAuditCreator(models.Model):
     """
@@ -21,3 +27,45 @@ class AbstractAuditUpdater(models.Model):
     class Meta:
         abstract = True
 
+
+def slug_base(model, value):
+    """The slug ``value`` gets when it is free: slugified and cut to length."""
+    max_length = model._meta.get_field("slug").max_length
+    return slugify(value)[:max_length].strip("-") or model._meta.model_name
+
+
+def unique_slug(model, value, exclude_pk=None, taken=()):
+    """
+    Slugify ``value`` into a ``slug`` not used by any other ``model`` row
+    (nor in ``taken``), appending ``-2``, ``-3``... on collision. Every
+    candidate is checked against a single query.
+    """
+    max_length = model._meta.get_field("slug").max_length
+    base = slug_base(model, value)
+    stem = base[:max_length - SLUG_SUFFIX_LENGTH].rstrip("-")
+
+    used = set(taken)
+    used.update(
+        model._default_manager.filter(slug__startswith=stem)
+        .exclude(pk=exclude_pk)
+        .values_list("slug", flat=True)
+    )
+    if base not in used:
+        return base
+    for number in itertools.count(2):
+        candidate = f"{stem}-{number}"
+        if candidate not in used:
+            return candidate
+
+
+class AutoSlugMixin:
+    """
+    Fills an empty ``slug`` from the ``slug_source`` field on save. Slugs
+    are kept when the source changes later, so published URLs stay valid.
+    """
+    slug_source = "name"
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = unique_slug(type(self), getattr(self, self.slug_source), exclude_pk=self.pk)
+        super().save(*args, **kwargs)
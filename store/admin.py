@@ -1,14 +1,28 @@
+from django import forms
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path
 from import_export.admin import ImportExportModelAdmin
+from store.importers import FEED_FORMATS, detect_format, iter_import_products, read_feed
 from store.models import Cart, CartItem, Category, Order, OrderItem, Product, User
 
 # Register your models here.
 
+class ProductFeedForm(forms.Form):
+    feed = forms.FileField(help_text="CSV with a header row, or JSON Lines.")
+    format = forms.ChoiceField(
+        choices=[("", "Detect from file name")] + [(name, name.upper()) for name in FEED_FORMATS],
+        required=False,
+    )
+
+
 @admin.register(User)
 class UserAdmin(ImportExportModelAdmin):
-    list_display = ["id", "name", "email", "is_admin", "is_creator"]
+    list_display = ["id", "name", "email", "is_admin", "is_creator", "is_active"]
     search_fields = ["name", "email"]
-    list_filter = ["is_admin", "is_creator"]
+    list_filter = ["is_admin", "is_creator", "is_active"]
     readonly_fields = ["password"]
     save_as = True
 
@@ -23,11 +37,60 @@ class CategoryAdmin(ImportExportModelAdmin):
 
 @admin.register(Product)
 class ProductAdmin(ImportExportModelAdmin):
-    list_display = ["id", "name", "price", "stock", "category", "created_by"]
-    search_fields = ["name", "description"]
+    list_display = ["id", "sku", "name", "price", "stock", "category", "created_by"]
+    search_fields = ["sku", "name", "description"]
     list_filter = ["category"]
     readonly_fields = ["created_by", "updated_by"]
     save_as = True
+    change_list_template = "admin/store/product/change_list.html"
+
+    def get_urls(self):
+        return [
+            path(
+                "import-feed/",
+                self.admin_site.admin_view(self.import_feed_view),
+                name="store_product_import_feed",
+            ),
+        ] + super().get_urls()
+
+    def import_feed_view(self, request):
+        """
+        Upload a CSV/JSONL product feed. Large feeds are imported in
+        chunks while the response streams progress, so neither memory nor
+        the request timeout grows with the file.
+        """
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+
+        form = ProductFeedForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            feed = form.cleaned_data["feed"]
+            feed_format = form.cleaned_data["format"] or detect_format(feed.name)
+            return StreamingHttpResponse(
+                self.stream_import(feed, feed_format, request.user.email),
+                content_type="text/plain; charset=utf-8",
+            )
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Import product feed",
+            "form": form,
+        }
+        return TemplateResponse(request, "admin/store/product/import_feed.html", context)
+
+    @staticmethod
+    def stream_import(feed, feed_format, user_email):
+        result = None
+        for result in iter_import_products(read_feed(feed, feed_format), user_email=user_email):
+            yield result.describe() + "\n"
+
+        if result is None:
+            yield "The feed contained no rows.\n"
+            return
+        for error in result.errors:
+            yield error + "\n"
+        yield f"Done: {result.imported} products imported, {result.skipped} rows skipped.\n"
 
 
 @admin.register(Cart)
@@ -0,0 +1,180 @@
+"""
+Async (ASGI-native) variants of the read-heavy store endpoints.
+
+They return the same payloads as their DRF counterparts in store.views but
+use Django's async ORM and async JWT authentication, so under an ASGI
+server a slow client never pins a worker thread. Enable them with
+``STORE_ASYNC_VIEWS``; store.urls then routes the same URLs here.
+"""
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from libs.renderers import RawJSON, dumps
+from libs.response import APIJsonResponse
+from store.authentication import AsyncJWTAuthentication
+from store.cache import product_cache
+from store.categories import category_listing
+from store.conditional import CachePolicy, etag_condition
+from store.models import Cart, CartItem
+from store.pagination import InvalidQueryParam, get_page_number, get_page_size, get_stream_flag
+from store.serializers import fast_product_detail, fast_product_list
+from store.views import (
+    EMPTY_CART_TOTALS,
+    cart_line_data,
+    cart_totals_data,
+    category_list_etag,
+    category_page_data,
+    get_product_paginator,
+    invalid_query_response,
+    product_detail_etag,
+    product_detail_rows,
+    product_list_etag,
+    product_page_data,
+    product_stream_response,
+)
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of DRF's APIView: authenticates the request
+    with AsyncJWTAuthentication and, when ``requires_authentication`` is set,
+    rejects anonymous requests the same way DRF's IsAuthenticated does.
+    """
+    authentication = AsyncJWTAuthentication()
+    requires_authentication = False
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            result = await self.authentication.aauthenticate(request)
+        except APIException as exc:
+            return self.not_authenticated(exc.detail)
+
+        request.user = result[0] if result else AnonymousUser()
+        if self.requires_authentication and not request.user.is_authenticated:
+            return self.not_authenticated("Authentication credentials were not provided.")
+
+        return await super().dispatch(request, *args, **kwargs)
+
+    def not_authenticated(self, detail):
+        response = JsonResponse(
+            detail if isinstance(detail, dict) else {"detail": detail},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+        response["WWW-Authenticate"] = self.authentication.authenticate_header(None)
+        return response
+
+
+def astreamed_rows(paginator, serializer, cursor):
+    """Async streamed_rows() for serializers without nested lists."""
+    using = paginator.queryset.db
+    chunks = paginator.astream(cursor, using=using)
+    return (serializer.serialize(rows) async for rows in chunks)
+
+
+class AsyncProductListAPIView(AsyncAPIView):
+    """Async variant of ProductListAPIView."""
+    cache_policy = CachePolicy.PUBLIC_REVALIDATE
+    read_from_replica = True
+
+    @etag_condition(product_list_etag)
+    async def get(self, request):
+        try:
+            paginator = get_product_paginator(request.GET)
+            if get_stream_flag(request.GET.get("stream")):
+                return product_stream_response(astreamed_rows(paginator, fast_product_list, request.GET.get("cursor")))
+            page = await paginator.apaginate(request.GET.get("cursor"))
+        except InvalidQueryParam as exc:
+            return invalid_query_response(exc, response_class=APIJsonResponse)
+
+        return APIJsonResponse(
+            success=True,
+            message="Product list fetched successfully.",
+            data=product_page_data(page),
+            status_code=status.HTTP_200_OK
+        )
+
+
+class AsyncProductDetailAPIView(AsyncAPIView):
+    """Async variant of ProductDetailAPIView, sharing its cache entries."""
+    cache_policy = CachePolicy.PUBLIC_REVALIDATE
+    read_from_replica = True
+
+    @etag_condition(product_detail_etag)
+    async def get(self, request, pk):
+        product_json = await product_cache.aget_or_load(pk, self.load_product)
+        if product_json is None:
+            return APIJsonResponse(
+                success=False,
+                message="Product not found.",
+                status_code=status.HTTP_404_NOT_FOUND,
+                data={}
+            )
+
+        return APIJsonResponse(
+            success=True,
+            message="Product fetched successfully.",
+            data={"product": RawJSON(product_json)},
+            status_code=status.HTTP_200_OK
+        )
+
+    @staticmethod
+    async def load_product(pk):
+        row = await product_detail_rows(pk).afirst()
+        return dumps(fast_product_detail.serialize_one(row)) if row else None
+
+
+class AsyncCategoryListAPIView(AsyncAPIView):
+    """Async variant of CategoryListAPIView."""
+    requires_authentication = True
+    cache_policy = CachePolicy.PRIVATE_REVALIDATE
+
+    @etag_condition(category_list_etag)
+    async def get(self, request):
+        try:
+            number = get_page_number(request.GET.get("page"))
+        except InvalidQueryParam as exc:
+            return invalid_query_response(exc, response_class=APIJsonResponse)
+        size = get_page_size(request.GET.get("page_size"))
+        categories, total = await category_listing.apage(number, size)
+
+        return APIJsonResponse(
+            success=True,
+            message="Category list fetched successfully.",
+            data=category_page_data(categories, number, size, total),
+            status_code=status.HTTP_200_OK
+        )
+
+
+class AsyncViewCartAPIView(AsyncAPIView):
+    """Async variant of ViewCartAPIView."""
+    requires_authentication = True
+
+    async def get(self, request):
+        try:
+            cart = await Cart.objects.aget(user=request.user)
+        except Cart.DoesNotExist:
+            return APIJsonResponse(
+                success=True,
+                message="Cart fetched successfully.",
+                data={
+                    "cart": [],
+                    **EMPTY_CART_TOTALS
+                },
+                status_code=status.HTTP_200_OK
+            )
+
+        items = CartItem.objects.filter(cart=cart).select_related("product")
+        cart_data = [cart_line_data(item) async for item in items]
+
+        return APIJsonResponse(
+            success=True,
+            message="Cart fetched successfully.",
+            data={
+                "cart": cart_data,
+                **cart_totals_data(cart)
+            },
+            status_code=status.HTTP_200_OK
+        )
@@ -0,0 +1,146 @@
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from store.cache import user_flags_cache
+from store.revocation import token_denylist
+
+
+# User fields copied into every token, enough for the views and
+# permissions to work without loading the user row
+USER_CLAIMS = ("email", "is_admin", "is_creator", "is_active")
+
+
+class StoreRefreshToken(RefreshToken):
+    """Refresh token carrying USER_CLAIMS; its access tokens inherit them."""
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+def user_flags(pk):
+    # Always the primary: flags read from a lagging replica would be cached
+    # under the version a demotion has just bumped
+    return get_user_model().objects.using(DEFAULT_DB_ALIAS).filter(pk=pk).values(*USER_CLAIMS)
+
+
+def load_user_flags(pk):
+    return user_flags(pk).first()
+
+
+async def aload_user_flags(pk):
+    return await user_flags(pk).afirst()
+
+
+def check_active(flags):
+    """Reject claims or cached flags of a deactivated user, like simplejwt's get_user()."""
+    if not flags["is_active"]:
+        raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+
+def token_user(user_id, flags):
+    """
+    Build a User from token claims without querying the database. Only the
+    id and USER_CLAIMS are loaded; the other fields are deferred, so reading
+    one (e.g. ``name``) fetches it on demand and ``save()`` only writes the
+    loaded fields.
+    """
+    user_model = get_user_model()
+    values = {api_settings.USER_ID_FIELD: user_id, **flags}
+    field_names = [field.attname for field in user_model._meta.concrete_fields if field.attname in values]
+    return user_model.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the signed USER_CLAIMS instead of loading
+    the user row on every request.
+
+    Claims are fixed for the token's lifetime, so by default a demoted or
+    deactivated user keeps their access token's rights until it expires.
+    Set ``STORE_USER_FLAGS_CACHE_TIMEOUT`` to read them from the user flags
+    cache instead, which is invalidated whenever the user changes, so
+    demotions, deactivations and deletions apply on the next request (in
+    every process when the cache is shared) at the cost of a query per
+    cache miss. Tokens minted without the claims fall back to the database
+    lookup. Inactive users are rejected either way.
+
+    Revoked tokens (see store.revocation) are rejected.
+    """
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if token_denylist.is_revoked(validated_token[api_settings.JTI_CLAIM]):
+            raise InvalidToken("Token has been revoked")
+        return validated_token
+
+    def get_user(self, validated_token):
+        user_id, flags = self.get_user_claims(validated_token)
+        if flags is None:
+            return super().get_user(validated_token)
+
+        if user_flags_cache.timeout:
+            flags = user_flags_cache.get_or_load(user_id, load_user_flags)
+            if flags is None:
+                raise AuthenticationFailed("User not found", code="user_not_found")
+
+        check_active(flags)
+        return token_user(user_id, flags)
+
+    def get_user_claims(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return user_id, None
+        return user_id, {claim: validated_token[claim] for claim in USER_CLAIMS}
+
+
+class AsyncJWTAuthentication(StatelessJWTAuthentication):
+    """
+    StatelessJWTAuthentication for async views. Token parsing and signature
+    checks are CPU only and reused as-is; any user or flags lookup goes
+    through the async ORM so it never blocks the event loop.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = JWTAuthentication.get_validated_token(self, raw_token)
+        if await token_denylist.ais_revoked(validated_token[api_settings.JTI_CLAIM]):
+            raise InvalidToken("Token has been revoked")
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id, flags = self.get_user_claims(validated_token)
+        if flags is not None:
+            if user_flags_cache.timeout:
+                flags = await user_flags_cache.aget_or_load(user_id, aload_user_flags)
+                if flags is None:
+                    raise AuthenticationFailed("User not found", code="user_not_found")
+            check_active(flags)
+            return token_user(user_id, flags)
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        return user
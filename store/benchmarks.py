@@ -0,0 +1,324 @@
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from store import STATUSCHOICES
+from store.authentication import StoreRefreshToken
+from store.models import Cart, CartItem, Category, Order, OrderItem, Product, User
+from store.passwords import authenticate_user
+from store.serializers import (
+    OrderSerializer,
+    ProductDetailDataSerializer,
+    ProductListSerializer,
+    fast_order,
+    fast_product_detail,
+    fast_product_list,
+)
+from store.services import (
+    checkout_cart,
+    refresh_cart_totals,
+    refresh_category_counts,
+    upsert_cart_items,
+)
+
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+SCENARIOS = [
+    "product-list",
+    "product-detail",
+    "category-list",
+    "add-to-cart",
+    "view-cart",
+    "cart-summary",
+    "checkout",
+    "order-history",
+]
+
+
+def seed_dataset(categories=10, products=1000, users=20, cart_items=5, orders=10, seed=0):
+    """
+    Create a synthetic catalog and customer base with bulk inserts.
+
+    Every user gets ``cart_items`` lines in their cart and ``orders`` past
+    orders of three lines each. Stock is set high enough that the
+    benchmarks never run out. Returns the created users.
+    """
+    rng = random.Random(seed)
+    password = make_password(BENCHMARK_PASSWORD)
+
+    category_objs = Category.objects.bulk_create([
+        Category(name=f"Benchmark Category {i}", slug=f"benchmark-category-{i}")
+        for i in range(categories)
+    ])
+    product_objs = Product.objects.bulk_create([
+        Product(
+            name=f"Benchmark Product {i}",
+            slug=f"benchmark-product-{i}",
+            description=f"Synthetic product {i} for benchmarking",
+            price=Decimal(rng.randint(100, 100000)) / 100,
+            stock=1_000_000,
+            category=category_objs[i % categories],
+        )
+        for i in range(products)
+    ], batch_size=1000)
+    refresh_category_counts([category.pk for category in category_objs])
+
+    user_objs = User.objects.bulk_create([
+        User(email=f"bench{i}@example.com", name=f"Bench User {i}", password=password)
+        for i in range(users)
+    ])
+    cart_objs = Cart.objects.bulk_create([Cart(user=user) for user in user_objs])
+
+    CartItem.objects.bulk_create([
+        CartItem(cart=cart, product=product, quantity=rng.randint(1, 3))
+        for cart in cart_objs
+        for product in rng.sample(product_objs, min(cart_items, products))
+    ], batch_size=1000)
+    refresh_cart_totals([cart.pk for cart in cart_objs])
+
+    order_objs = Order.objects.bulk_create([
+        Order(user=user, total_amount=Decimal("0.00"), status=STATUSCHOICES.COMPLETED)
+        for user in user_objs
+        for _ in range(orders)
+    ], batch_size=1000)
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, quantity=1, price_at_order_time=product.price)
+        for order in order_objs
+        for product in rng.sample(product_objs, min(3, products))
+    ], batch_size=1000)
+
+    return user_objs
+
+
+def _percentile(samples, percent):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def _measure(request, iterations, setup=None, close_connections=False):
+    """
+    Time ``iterations`` calls of ``request``; the first call also counts
+    queries. ``close_connections`` closes the database connection after
+    every call, as a server does at the end of each request when
+    connections are neither persistent nor pooled, so the connection
+    setup cost is included in the timings.
+    """
+    if setup:
+        setup()
+    with CaptureQueriesContext(connection) as queries:
+        request()
+    query_count = len(queries.captured_queries)
+
+    samples = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        request()
+        if close_connections:
+            connection.close()
+        samples.append(time.perf_counter() - started)
+
+    total = sum(samples)
+    return {
+        "iterations": iterations,
+        "rps": round(iterations / total, 1) if total else None,
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p99_ms": round(_percentile(samples, 99) * 1000, 3),
+        "queries": query_count,
+    }
+
+
+def run_benchmarks(users, iterations=50, scenarios=SCENARIOS, close_connections=False):
+    """Exercise each API scenario through the test client and return its stats."""
+    user = users[0]
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {StoreRefreshToken.for_user(user).access_token}")
+    cart = Cart.objects.get(user=user)
+    product = Product.objects.order_by("id").first()
+    checkout_lines = {
+        product_id: 1
+        for product_id in Product.objects.order_by("id").values_list("id", flat=True)[:5]
+    }
+
+    def ok(response):
+        if response.status_code >= 300:
+            raise RuntimeError(f"{response.status_code}: {response.content[:200]!r}")
+        return response
+
+    requests = {
+        "product-list": (lambda: ok(client.get("/api/store/product-list/", {"page_size": 20})), None),
+        "product-detail": (lambda: ok(client.get(f"/api/store/{product.id}/")), None),
+        "category-list": (lambda: ok(client.get("/api/store/admin/category/list/")), None),
+        "add-to-cart": (
+            lambda: ok(client.post(f"/api/store/cart/add/{product.id}/", {"quantity": 1}, format="json")),
+            None,
+        ),
+        "view-cart": (lambda: ok(client.get("/api/store/cart/")), None),
+        "cart-summary": (lambda: ok(client.get("/api/store/cart/summary/")), None),
+        "checkout": (
+            lambda: ok(client.post("/api/store/orders/checkout/")),
+            lambda: upsert_cart_items(cart, checkout_lines),
+        ),
+        "order-history": (lambda: ok(client.get("/api/store/orders/history/")), None),
+    }
+
+    # Warm up once so one-off per-process loads, such as the revoked-token
+    # filter, are not counted against the first scenario
+    ok(client.get("/api/store/orders/history/"))
+
+    results = {}
+    for name in scenarios:
+        request, setup = requests[name]
+        results[name] = _measure(request, iterations, setup=setup, close_connections=close_connections)
+    return results
+
+
+def run_checkout_writer(user_id, product_ids, checkouts):
+    """
+    Refill ``user_id``'s cart and check it out ``checkouts`` times, as one
+    of several concurrent writer processes. Returns the number of
+    completed checkouts, the number that failed on a locked database and
+    the elapsed seconds.
+    """
+    user = User.objects.get(pk=user_id)
+    cart = Cart.objects.get(user=user)
+    lines = {product_id: 1 for product_id in product_ids}
+
+    completed = locked = 0
+    started = time.perf_counter()
+    for _ in range(checkouts):
+        try:
+            upsert_cart_items(cart, lines)
+            checkout_cart(cart, user)
+        except OperationalError as exc:
+            if "locked" not in str(exc):
+                raise
+            locked += 1
+        else:
+            completed += 1
+    return completed, locked, time.perf_counter() - started
+
+
+def run_login_benchmark(emails, logins=200, threads=8):
+    """
+    Log in ``logins`` times from ``threads`` concurrent request threads,
+    cycling through ``emails`` (all with BENCHMARK_PASSWORD). Returns the
+    login rate and latency percentiles.
+    """
+    def login(index):
+        started = time.perf_counter()
+        try:
+            if authenticate_user(emails[index % len(emails)], BENCHMARK_PASSWORD) is None:
+                raise RuntimeError("Benchmark login failed")
+            return time.perf_counter() - started
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        samples = list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "logins": logins,
+        "logins_per_sec": round(logins / elapsed, 1),
+        "p50_ms": round(statistics.median(samples) * 1000, 1),
+        "p99_ms": round(_percentile(samples, 99) * 1000, 1),
+    }
+
+
+SERIALIZER_CASES = {
+    # name: (DRF serializer and queryset, compiled serializer and queryset)
+    "products": (
+        lambda: (ProductListSerializer, Product.objects.order_by("id")),
+        lambda: (fast_product_list, Product.objects.order_by("id")),
+    ),
+    "product-details": (
+        lambda: (ProductDetailDataSerializer, Product.objects.select_related("category").order_by("id")),
+        lambda: (fast_product_detail, Product.objects.order_by("id")),
+    ),
+    "orders": (
+        lambda: (OrderSerializer, Order.objects.with_items().order_by("id")),
+        lambda: (fast_order, Order.objects.order_by("id")),
+    ),
+}
+
+
+def render_drf(serializer_class, queryset):
+    return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+
+def render_fast(serializer, queryset):
+    return JSONRenderer().render(serializer.serialize(serializer.values(queryset)))
+
+
+def run_serializer_benchmark(iterations=10, cases=SERIALIZER_CASES):
+    """
+    Load and serialize every row of each case with the DRF serializer and
+    with its compiled values() counterpart. Returns rows per second for
+    both and whether the rendered JSON is identical.
+    """
+    results = {}
+    for name, (drf_case, fast_case) in cases.items():
+        drf_serializer, drf_queryset = drf_case()
+        fast_serializer, fast_queryset = fast_case()
+        rows = fast_queryset.count()
+
+        timings = {}
+        for label, render, serializer, queryset in (
+            ("drf", render_drf, drf_serializer, drf_queryset),
+            ("fast", render_fast, fast_serializer, fast_queryset),
+        ):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                # all() drops the previous iteration's result cache
+                output = render(serializer, queryset.all())
+            timings[label] = (time.perf_counter() - started, output)
+
+        results[name] = {
+            "rows": rows,
+            "drf_rows_per_sec": round(rows * iterations / timings["drf"][0], 1),
+            "fast_rows_per_sec": round(rows * iterations / timings["fast"][0], 1),
+            "speedup": round(timings["drf"][0] / timings["fast"][0], 2),
+            "identical": timings["drf"][1] == timings["fast"][1],
+        }
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=0.2):
+    """
+    Return human readable regressions: more queries than the baseline, or a
+    p50 latency more than ``tolerance`` slower.
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        if result["queries"] > expected["queries"]:
+            regressions.append(f"{name}: {result['queries']} queries (baseline {expected['queries']})")
+        if result["p50_ms"] > expected["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {result['p50_ms']}ms (baseline {expected['p50_ms']}ms)")
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as fp:
+        return json.load(fp)["results"]
+
+
+def save_baseline(path, results, dataset):
+    with open(path, "w") as fp:
+        json.dump({"dataset": dataset, "results": results}, fp, indent=2, sort_keys=True)
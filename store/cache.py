@@ -0,0 +1,122 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def get_store_cache():
+    """Return the cache backend configured by ``STORE_CACHE_ALIAS``."""
+    return caches[getattr(settings, "STORE_CACHE_ALIAS", "default")]
+
+
+def _new_version():
+    # Seeding from the clock means an evicted counter can never come back
+    # at a value that still has stale data cached under it.
+    return time.time_ns() // 1000
+
+
+class VersionedCache:
+    """
+    Read-through cache where every object has its own version counter.
+
+    Data is stored under ``<prefix>:<pk>:v<version>``. Invalidation bumps the
+    counter instead of deleting the data, so a reader that loaded from the
+    database just before a write can only ever repopulate the old version,
+    which nobody reads any more.
+    """
+    def __init__(self, prefix, timeout_setting, default_timeout=300):
+        self.prefix = prefix
+        self.timeout_setting = timeout_setting
+        self.default_timeout = default_timeout
+
+    @property
+    def timeout(self):
+        return getattr(settings, self.timeout_setting, self.default_timeout)
+
+    def version_key(self, pk):
+        return f"{self.prefix}:{pk}:version"
+
+    def data_key(self, pk, version):
+        return f"{self.prefix}:{pk}:v{version}"
+
+    def get_version(self, pk):
+        cache = get_store_cache()
+        version = cache.get(self.version_key(pk))
+        if version is None:
+            cache.add(self.version_key(pk), _new_version(), timeout=None)
+            version = cache.get(self.version_key(pk))
+        return version
+
+    def get_or_load(self, pk, loader):
+        """
+        Return the cached value for ``pk``, calling ``loader(pk)`` on a miss.
+        ``None`` results (e.g. missing rows) are not cached.
+        """
+        cache = get_store_cache()
+        key = self.data_key(pk, self.get_version(pk))
+        value = cache.get(key)
+        if value is None:
+            value = loader(pk)
+            if value is not None:
+                cache.set(key, value, self.timeout)
+        return value
+
+    async def aget_version(self, pk):
+        cache = get_store_cache()
+        version = await cache.aget(self.version_key(pk))
+        if version is None:
+            await cache.aadd(self.version_key(pk), _new_version(), timeout=None)
+            version = await cache.aget(self.version_key(pk))
+        return version
+
+    async def aget_or_load(self, pk, loader):
+        """Async get_or_load(); ``loader`` must be a coroutine function."""
+        cache = get_store_cache()
+        key = self.data_key(pk, await self.aget_version(pk))
+        value = await cache.aget(key)
+        if value is None:
+            value = await loader(pk)
+            if value is not None:
+                await cache.aset(key, value, self.timeout)
+        return value
+
+    def invalidate(self, pks):
+        """Bump the version of every pk once the current transaction commits."""
+        pks = list(pks)
+        if pks:
+            transaction.on_commit(lambda: self.bump(pks))
+
+    def bump(self, pks):
+        """Bump the version of every pk immediately."""
+        for pk in pks:
+            self.bump_version(pk)
+
+    def bump_version(self, pk):
+        """Bump the version of ``pk`` immediately and return the new version."""
+        cache = get_store_cache()
+        try:
+            return cache.incr(self.version_key(pk))
+        except ValueError:
+            version = _new_version()
+            cache.set(self.version_key(pk), version, timeout=None)
+            return version
+
+
+# Product detail payloads, stored as encoded JSON that responses embed as-is
+product_cache = VersionedCache("store:product-json", "STORE_PRODUCT_CACHE_TIMEOUT")
+
+# Product id by slug, for the slug detail route
+product_slug_cache = VersionedCache("store:product-slug", "STORE_PRODUCT_CACHE_TIMEOUT")
+
+# Collection-wide entries, keyed by name ("products", "categories"); their
+# versions change whenever any member of the collection does.
+catalog_cache = VersionedCache("store:catalog", "STORE_CATALOG_CACHE_TIMEOUT")
+
+# Per-user authorization flags for StatelessJWTAuthentication. Disabled
+# (claims are trusted as signed) unless the timeout is set.
+user_flags_cache = VersionedCache("store:user-flags", "STORE_USER_FLAGS_CACHE_TIMEOUT", default_timeout=0)
+
+# Version of the revoked-token bloom filters (key "filter"); the timeout
+# applies to cached "not revoked" answers for bloom false positives.
+denylist_cache = VersionedCache("store:denylist", "STORE_TOKEN_DENYLIST_CACHE_TIMEOUT", default_timeout=60)
@@ -0,0 +1,92 @@
+"""
+Process-local category listing.
+
+The full category list, with the product and in-stock counts materialized
+on each Category row, is small and read on every home page load. Each
+process keeps it in memory, tagged with the shared "categories" catalog
+version, so serving a page costs one cache read and no query. Any change
+to a category or to its counts bumps the version and the next request in
+each process reloads the list with a single query.
+
+The listing also maps category slugs to ids, so slug URLs resolve without
+a query. The WSGI and ASGI entry points warm it before the first request.
+"""
+import threading
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from store.cache import catalog_cache
+from store.models import Category
+
+
+CATEGORY_FIELDS = ("id", "name", "slug", "product_count", "in_stock_count")
+
+
+class CategoryListing:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._categories = []
+        self._ids_by_slug = {}
+        self._version = None
+
+    def load(self, version):
+        # Always the primary: a lagging replica would pin stale counts to
+        # the new version until the next change
+        categories = list(
+            Category.objects.using(DEFAULT_DB_ALIAS).order_by("id").values(*CATEGORY_FIELDS)
+        )
+        ids_by_slug = {category["slug"]: category["id"] for category in categories}
+        with self._lock:
+            self._categories = categories
+            self._ids_by_slug = ids_by_slug
+            self._version = version
+        return categories
+
+    def warm(self):
+        """Load the listing at startup; if the database isn't ready the first request does."""
+        try:
+            self.all()
+        except DatabaseError:
+            pass
+        finally:
+            # Don't hand an open connection to forked workers
+            connections.close_all()
+
+    def all(self):
+        """Every category as a dict of CATEGORY_FIELDS, ordered by id."""
+        version = catalog_cache.get_version("categories")
+        if version != self._version:
+            return self.load(version)
+        return self._categories
+
+    async def aall(self):
+        """Async all(); the database is only touched off the event loop."""
+        version = await catalog_cache.aget_version("categories")
+        if version != self._version:
+            return await sync_to_async(self.load)(version)
+        return self._categories
+
+    def id_for_slug(self, slug):
+        """The id of the category with ``slug``, or None."""
+        self.all()
+        return self._ids_by_slug.get(slug)
+
+    async def aid_for_slug(self, slug):
+        await self.aall()
+        return self._ids_by_slug.get(slug)
+
+    def page(self, number, size):
+        """Return ``(categories, total)`` for 1-based page ``number``."""
+        return self.paginate(self.all(), number, size)
+
+    async def apage(self, number, size):
+        return self.paginate(await self.aall(), number, size)
+
+    @staticmethod
+    def paginate(categories, number, size):
+        start = (number - 1) * size
+        return categories[start:start + size], len(categories)
+
+
+category_listing = CategoryListing()
@@ -0,0 +1,59 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+class CachePolicy:
+    """
+    Cache-Control values a view can opt into through its ``cache_policy``
+    attribute. Views that don't set one get PRIVATE_NO_STORE.
+    """
+    PRIVATE_NO_STORE = "private, no-store, no-cache, must-revalidate, max-age=0"
+    # Cacheable anywhere, but revalidated with the ETag on every use
+    PUBLIC_REVALIDATE = "public, no-cache"
+    # Cacheable by the browser only, revalidated with the ETag on every use
+    PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def etag_condition(etag_func):
+    """
+    Decorate a view's ``get`` method (sync or async) with strong ETag handling.
+
+    ``etag_func(request, *args, **kwargs)`` must be cheap (no serialization,
+    ideally no database access). When the client's ``If-None-Match`` matches,
+    a 304 is returned without calling the view; otherwise successful
+    responses are stamped with the ETag.
+    """
+    def not_modified(request, etag):
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            response["ETag"] = etag
+        return response
+
+    def stamp(response, etag):
+        if response.status_code == 200:
+            response["ETag"] = etag
+        return response
+
+    def decorator(method):
+        if iscoroutinefunction(method):
+            @wraps(method)
+            async def async_wrapper(view, request, *args, **kwargs):
+                etag = quote_etag(await sync_to_async(etag_func)(request, *args, **kwargs))
+                response = not_modified(request, etag)
+                if response is not None:
+                    return response
+                return stamp(await method(view, request, *args, **kwargs), etag)
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            etag = quote_etag(etag_func(request, *args, **kwargs))
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+            return stamp(method(view, request, *args, **kwargs), etag)
+        return wrapper
+    return decorator
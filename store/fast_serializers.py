@@ -0,0 +1,166 @@
+"""
+Compiled serializers for the hot read-only endpoints.
+
+A FastSerializer is built from an existing DRF ModelSerializer and produces
+the same output, key for key and byte for byte once rendered, from
+``values()`` rows instead of model instances. The work DRF repeats for
+every row (copying the declared fields, resolving each attribute, calling
+every field's ``to_representation``) is done once when the serializer is
+compiled. Per row only the conversions that change a value (decimals,
+datetimes, file URLs) are applied. Nested ``many=True`` serializers over a
+reverse foreign key are loaded with one extra query for all rows.
+"""
+from collections import defaultdict
+from functools import cached_property
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.fields import empty
+
+from store.metrics import serializer_timer
+
+
+# Fields whose to_representation returns database values unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.ReadOnlyField,
+)
+
+# Marks a key DRF leaves out (SkipField) when a relation on its source is null
+SKIP = object()
+
+
+class FastSerializer:
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def model(self):
+        return self.serializer_class.Meta.model
+
+    @cached_property
+    def compiled(self):
+        """
+        ``(columns, nested)``: ``columns`` are ``(key, lookup, convert,
+        guards, missing)`` with ``convert`` None for passthrough fields,
+        ``guards`` the nullable foreign keys crossed by a dotted source and
+        ``missing`` what DRF gives when one of them is null. ``nested`` are
+        ``(key, FastSerializer, foreign key name)``.
+        """
+        columns, nested = [], []
+        for key, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*" or getattr(field, "source_attrs", None) is None:
+                raise ImproperlyConfigured(f"{self.serializer_class.__name__}.{key} cannot be compiled.")
+
+            if isinstance(field, serializers.ListSerializer):
+                relation = self._reverse_relation(field.source)
+                nested.append((key, FastSerializer(type(field.child)), relation.field.name))
+                continue
+
+            lookup = "__".join(field.source_attrs)
+            columns.append((
+                key, lookup, self._converter(field, lookup),
+                self._nullable_relations(field.source_attrs), self._missing(field),
+            ))
+        return columns, nested
+
+    def _nullable_relations(self, source_attrs):
+        guards, model = [], self.model
+        for index, attr in enumerate(source_attrs[:-1], start=1):
+            relation = model._meta.get_field(attr)
+            if relation.null:
+                guards.append("__".join(source_attrs[:index]))
+            model = relation.related_model
+        return guards
+
+    @staticmethod
+    def _missing(field):
+        # Field.get_attribute() when an attribute on the way is None
+        if field.default is not empty:
+            return field.get_default()
+        if field.allow_null or field.required:
+            return None
+        return SKIP
+
+    def _reverse_relation(self, accessor):
+        for relation in self.model._meta.related_objects:
+            if relation.one_to_many and relation.get_accessor_name() == accessor:
+                return relation
+        raise ImproperlyConfigured(f"{self.model.__name__}.{accessor} is not a reverse foreign key.")
+
+    def _converter(self, field, lookup):
+        if isinstance(field, serializers.FileField):
+            # values() returns the stored name; DRF renders the storage URL
+            storage = self.model._meta.get_field(lookup).storage
+            return lambda name: storage.url(name) if name else None
+        if isinstance(field, PASSTHROUGH_FIELDS):
+            return None
+        return field.to_representation
+
+    @cached_property
+    def lookups(self):
+        """
+        The ``values()`` lookups a row needs, including the nullable foreign
+        keys of dotted sources and ``id`` for nested rows.
+        """
+        columns, nested = self.compiled
+        lookups = [lookup for _, lookup, *_ in columns]
+        lookups += [guard for *_, guards, _ in columns for guard in guards]
+        if nested:
+            lookups.append("id")
+        return list(dict.fromkeys(lookups))
+
+    def values(self, queryset, *extra):
+        """``queryset`` as the values() rows serialize() expects."""
+        return queryset.values(*dict.fromkeys([*self.lookups, *extra]))
+
+    def serialize(self, rows, using=None):
+        """
+        Serialize values() rows like ``serializer_class(objs, many=True).data``.
+        Nested rows are read from ``using``, or wherever the router sends them.
+        """
+        with serializer_timer():
+            rows = list(rows)
+            columns, nested = self.compiled
+            children = [
+                (key, serializer.grouped(foreign_key, [row["id"] for row in rows], using=using))
+                for key, serializer, foreign_key in nested
+            ]
+
+            data = []
+            for row in rows:
+                item = {}
+                for key, lookup, convert, guards, missing in columns:
+                    if any(row[guard] is None for guard in guards):
+                        if missing is not SKIP:
+                            item[key] = missing
+                        continue
+                    value = row[lookup]
+                    item[key] = value if convert is None or value is None else convert(value)
+                for key, groups in children:
+                    item[key] = groups.get(row["id"], [])
+                data.append(item)
+            return data
+
+    def serialize_one(self, row):
+        return self.serialize([row])[0]
+
+    def grouped(self, foreign_key, ids, using=None):
+        """Serialized child rows whose ``foreign_key`` is in ``ids``, grouped by it."""
+        groups = defaultdict(list)
+        if not ids:
+            return groups
+        rows = self.values(
+            self.model._default_manager.db_manager(using).filter(**{f"{foreign_key}__in": ids}).order_by("id"),
+            foreign_key,
+        )
+        rows = list(rows)
+        for row, item in zip(rows, self.serialize(rows, using=using)):
+            groups[row[foreign_key]].append(item)
+        return groups
@@ -0,0 +1,31 @@
+"""
+Password hashers with costs taken from settings.
+
+They keep the algorithm names of Django's hashers, so existing hashes stay
+valid. Changing a cost setting makes ``must_update`` true for old hashes,
+and they are upgraded on the user's next login.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, BCryptSHA256PasswordHasher
+
+
+class StoreArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id. Memory cost is in KiB; parallelism is per hash."""
+    # Read on use, not at import, so changed settings take effect
+    @property
+    def time_cost(self):
+        return settings.STORE_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.STORE_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.STORE_ARGON2_PARALLELISM
+
+
+class StoreBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    @property
+    def rounds(self):
+        return settings.STORE_BCRYPT_ROUNDS
@@ -0,0 +1,268 @@
+"""
+Streaming product feed import.
+
+Feeds are CSV (with a header row) or JSON Lines, one product per row with
+the fields ``sku``, ``name``, ``description``, ``price``, ``stock`` and
+``category`` (a category slug). Rows are read lazily and written in
+chunks with one ``INSERT ... ON CONFLICT (sku) DO UPDATE`` each, so memory
+stays flat however large the feed is.
+"""
+import csv
+import io
+import json
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+
+from store.cache import catalog_cache, product_cache
+from store.abstract import slug_base, unique_slug
+from store.models import Cart, Category, Product
+from store.services import refresh_cart_totals, refresh_category_counts
+
+
+FEED_FORMATS = ("csv", "jsonl")
+DEFAULT_CHUNK_SIZE = 1000
+
+# Only the first few row errors are kept; the rest are just counted
+MAX_REPORTED_ERRORS = 100
+
+UPDATE_FIELDS = ["name", "description", "price", "stock", "category", "updated_by", "updated_at"]
+
+
+class FeedRowError(Exception):
+    """Raised for a feed row that cannot be imported."""
+
+
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    @property
+    def rate(self):
+        elapsed = time.perf_counter() - self.started
+        return self.imported / elapsed if elapsed else 0.0
+
+    def describe(self):
+        return f"{self.imported} imported, {self.skipped} skipped ({self.rate:.0f} rows/s)"
+
+    def add_error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line}: {message}")
+
+
+def detect_format(filename):
+    """Guess the feed format from a file name, defaulting to CSV."""
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_feed(stream, feed_format):
+    """
+    Yield ``(line_number, row)`` pairs from a binary or text stream without
+    reading it into memory.
+    """
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if feed_format == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        # Malformed lines are reported by import_products like any bad row
+        yield line_number, row if isinstance(row, dict) else None
+
+
+class CategoryResolver:
+    """
+    Maps category slugs to ids for the whole import, querying only the
+    slugs it has not seen yet, once per chunk.
+    """
+    def __init__(self):
+        self.ids = {}
+
+    def load(self, slugs):
+        missing = {slug for slug in slugs if slug not in self.ids}
+        if missing:
+            found = dict(Category.objects.filter(slug__in=missing).values_list("slug", "id"))
+            for slug in missing:
+                self.ids[slug] = found.get(slug)
+
+    def get(self, slug):
+        return self.ids.get(slug)
+
+
+def _text(row, field):
+    value = row.get(field)
+    return "" if value is None else str(value).strip()
+
+
+def build_product(row, categories, user_email):
+    if row is None:
+        raise FeedRowError("not a JSON object")
+
+    sku = _text(row, "sku")
+    name = _text(row, "name")
+    if not sku:
+        raise FeedRowError("sku is required")
+    if not name:
+        raise FeedRowError("name is required")
+    for field, value in (("sku", sku), ("name", name)):
+        if len(value) > Product._meta.get_field(field).max_length:
+            raise FeedRowError(f"{field} is too long")
+
+    try:
+        price = Decimal(str(row.get("price")))
+        stock = int(row.get("stock"))
+    except (InvalidOperation, TypeError, ValueError):
+        raise FeedRowError("price and stock must be numbers")
+    if not price.is_finite() or price < 0 or stock < 0:
+        raise FeedRowError("price and stock must not be negative")
+
+    # Out-of-range values would fail the whole chunk's INSERT, not just this row
+    price_field = Product._meta.get_field("price")
+    max_price = Decimal(10) ** (price_field.max_digits - price_field.decimal_places)
+    cents = Decimal(1).scaleb(-price_field.decimal_places)
+    # Checked before quantize() too, which raises past 28 digits
+    if price >= max_price or price.quantize(cents) >= max_price:
+        raise FeedRowError(f"price must be less than {max_price}")
+    price = price.quantize(cents)
+    _, max_stock = connection.ops.integer_field_range(
+        Product._meta.get_field("stock").get_internal_type()
+    )
+    if stock > max_stock:
+        raise FeedRowError(f"stock must be at most {max_stock}")
+
+    slug = _text(row, "category")
+    category_id = categories.get(slug)
+    if category_id is None:
+        raise FeedRowError(f"unknown category {slug!r}")
+
+    return Product(
+        sku=sku,
+        name=name,
+        description=_text(row, "description") or None,
+        price=price,
+        stock=stock,
+        category_id=category_id,
+        created_by=user_email,
+        updated_by=user_email,
+    )
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def assign_slugs(products, existing_slugs):
+    """
+    Set the slug of every product: the one it already has for known skus
+    (``existing_slugs``), else one generated from its name. Free slugs are
+    confirmed with one query; only collisions cost another each.
+    """
+    new_products = [product for product in products if product.sku not in existing_slugs]
+    bases = {product.sku: slug_base(Product, product.name) for product in new_products}
+    taken = set(Product.objects.filter(slug__in=set(bases.values())).values_list("slug", flat=True))
+
+    used = set()
+    for product in products:
+        if product.sku in existing_slugs:
+            product.slug = existing_slugs[product.sku]
+        elif bases[product.sku] in taken or bases[product.sku] in used:
+            product.slug = unique_slug(Product, product.name, taken=used)
+        else:
+            product.slug = bases[product.sku]
+        used.add(product.slug)
+
+
+def upsert_products(products):
+    """Insert or update ``products`` by sku in one statement; returns their ids."""
+    skus = [product.sku for product in products]
+    with transaction.atomic():
+        existing = {
+            sku: (slug, category_id)
+            for sku, slug, category_id in Product.objects.filter(sku__in=skus).values_list(
+                "sku", "slug", "category_id"
+            )
+        }
+        assign_slugs(products, {sku: slug for sku, (slug, _) in existing.items()})
+        # Products moving category change the counts of the one they leave
+        category_ids = {product.category_id for product in products}
+        category_ids.update(category_id for _, category_id in existing.values())
+
+        Product.objects.bulk_create(
+            products,
+            update_conflicts=True,
+            unique_fields=["sku"],
+            update_fields=UPDATE_FIELDS,
+        )
+        ids = list(
+            Product.objects.filter(sku__in=skus).values_list("id", flat=True)
+        )
+        # bulk_create skips the model signals that keep caches, cart totals
+        # and category counts current
+        product_cache.invalidate(ids)
+        catalog_cache.invalidate(["products", "search"])
+        refresh_cart_totals(Cart.objects.filter(store_cartitem_cart__product__in=ids).values("pk"))
+        refresh_category_counts(category_ids)
+    return ids
+
+
+def iter_import_products(rows, chunk_size=DEFAULT_CHUNK_SIZE, user_email=None):
+    """
+    Upsert products from ``(line_number, row)`` pairs, as produced by
+    read_feed(), ``chunk_size`` rows at a time, yielding the running
+    ImportResult after every chunk. Bad rows are skipped and reported in
+    the result.
+    """
+    result = ImportResult()
+    categories = CategoryResolver()
+
+    for chunk in _chunks(rows, chunk_size):
+        categories.load(_text(row, "category") for _, row in chunk if row is not None)
+
+        # A repeated sku keeps its last row; one statement cannot update a row twice
+        products = {}
+        for line, row in chunk:
+            try:
+                product = build_product(row, categories, user_email)
+            except FeedRowError as exc:
+                result.add_error(line, str(exc))
+                continue
+            products[product.sku] = product
+
+        if products:
+            upsert_products(list(products.values()))
+            result.imported += len(products)
+
+        yield result
+
+
+def import_products(rows, chunk_size=DEFAULT_CHUNK_SIZE, user_email=None, progress=None):
+    """Run iter_import_products() to the end, calling ``progress(result)`` per chunk."""
+    result = ImportResult()
+    for result in iter_import_products(rows, chunk_size, user_email):
+        if progress:
+            progress(result)
+    return result
@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from store.benchmarks import run_checkout_writer, seed_dataset
+from store.models import Product
+
+
+def _writer(user_id, product_ids, checkouts, queue):
+    queue.put(run_checkout_writer(user_id, product_ids, checkouts))
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Run checkouts from several processes at once against an on-disk "
+        "SQLite test database and report checkout throughput and lock "
+        "failures. Compare runs with DB_SQLITE_TUNED on and off."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=4, help="Concurrent writer processes.")
+        parser.add_argument("--checkouts", type=int, default=50, help="Checkouts per writer.")
+        parser.add_argument("--products", type=int, default=100)
+        parser.add_argument("--lines", type=int, default=3, help="Cart lines per checkout.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("This benchmark measures SQLite write contention; the default database is not SQLite.")
+
+        # Writer processes need a database file they can all open
+        fd, path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        os.remove(path)
+        connection.settings_dict["TEST"]["NAME"] = path
+
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            users = seed_dataset(products=options["products"], users=options["writers"], cart_items=0, orders=0)
+            product_ids = list(Product.objects.order_by("id").values_list("id", flat=True)[:options["lines"]])
+            connections.close_all()
+
+            context = multiprocessing.get_context("fork")
+            queue = context.Queue()
+            processes = [
+                context.Process(target=_writer, args=(user.pk, product_ids, options["checkouts"], queue))
+                for user in users
+            ]
+            started = time.perf_counter()
+            for process in processes:
+                process.start()
+            results = [queue.get() for _ in processes]
+            for process in processes:
+                process.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        completed = sum(result[0] for result in results)
+        locked = sum(result[1] for result in results)
+        self.stdout.write(f"engine:             {connection.settings_dict['ENGINE']}")
+        self.stdout.write(f"writers:            {options['writers']}")
+        self.stdout.write(f"checkouts:          {completed}")
+        self.stdout.write(f"locked failures:    {locked}")
+        self.stdout.write(f"checkouts/sec:      {completed / elapsed:.1f}")
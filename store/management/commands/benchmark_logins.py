@@ -0,0 +1,63 @@
+import os
+
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from store.benchmarks import BENCHMARK_PASSWORD, run_login_benchmark
+from store.models import User
+from store.passwords import password_hasher
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure logins per second, and per core, with the configured "
+        "password hasher, hashing on the request threads and in hashing "
+        "pools of the given sizes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--logins", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent request threads.")
+        parser.add_argument(
+            "--workers", type=int, nargs="+", default=[0, os.cpu_count()],
+            help="Hashing pool sizes to compare; 0 hashes on the request thread.",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            # One hash shared by every user keeps seeding fast
+            encoded = make_password(BENCHMARK_PASSWORD)
+            users = User.objects.bulk_create([
+                User(email=f"login{i}@example.com", name=f"Login User {i}", password=encoded)
+                for i in range(options["users"])
+            ])
+            emails = [user.email for user in users]
+
+            self.stdout.write(f"hasher: {get_hasher().algorithm}, request threads: {options['threads']}")
+            self.stdout.write(f"{'workers':<10}{'logins/s':>10}{'per core':>10}{'p50 ms':>10}{'p99 ms':>10}")
+            for workers in options["workers"]:
+                with override_settings(
+                    STORE_PASSWORD_HASH_WORKERS=workers,
+                    STORE_PASSWORD_HASH_MAX_PENDING=options["logins"],
+                ):
+                    try:
+                        result = run_login_benchmark(emails, options["logins"], options["threads"])
+                    finally:
+                        password_hasher.shutdown()
+
+                # Without a pool, hashing holds the GIL: one core at most
+                per_core = result["logins_per_sec"] / max(1, workers)
+                self.stdout.write(
+                    f"{workers:<10}{result['logins_per_sec']:>10}{per_core:>10.1f}"
+                    f"{result['p50_ms']:>10}{result['p99_ms']:>10}"
+                )
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from store.benchmarks import run_serializer_benchmark, seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset into a throwaway test database and compare "
+        "rows per second of the DRF serializers and their compiled values() "
+        "counterparts for the product list and order history."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=5000)
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--orders", type=int, default=50, help="Past orders per user.")
+        parser.add_argument("--iterations", type=int, default=10)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            self.stdout.write("Seeding ...")
+            seed_dataset(
+                products=options["products"],
+                users=options["users"],
+                cart_items=0,
+                orders=options["orders"],
+            )
+            results = run_serializer_benchmark(iterations=options["iterations"])
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        self.stdout.write(f"{'case':<17}{'rows':>8}{'drf rows/s':>14}{'fast rows/s':>14}{'speedup':>9}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<17}{result['rows']:>8}{result['drf_rows_per_sec']:>14}"
+                f"{result['fast_rows_per_sec']:>14}{result['speedup']:>8}x"
+            )
+
+        mismatched = [name for name, result in results.items() if not result["identical"]]
+        if mismatched:
+            raise CommandError(f"Compiled output differs from DRF for: {', '.join(mismatched)}")
+        self.stdout.write(self.style.SUCCESS("Compiled and DRF output are identical."))
@@ -0,0 +1,89 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from store.benchmarks import (
+    SCENARIOS,
+    compare_to_baseline,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+    seed_dataset,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset into a throwaway test database and report "
+        "throughput, p50/p99 latency and query counts for the main store endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--products", type=int, default=1000)
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--cart-items", type=int, default=5)
+        parser.add_argument("--orders", type=int, default=10, help="Past orders per user.")
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--scenario", action="append", choices=SCENARIOS, dest="scenarios")
+        parser.add_argument(
+            "--baseline",
+            default=os.path.join(settings.BASE_DIR, "benchmarks", "baseline.json"),
+            help="Baseline file to compare against (or write with --save-baseline).",
+        )
+        parser.add_argument(
+            "--close-connections", action="store_true",
+            help=(
+                "Close the database connection after every request. Compare runs "
+                "with DB_POOL on and off to measure what pooling saves."
+            ),
+        )
+        parser.add_argument("--save-baseline", action="store_true")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.2,
+            help="Allowed p50 slowdown against the baseline, as a fraction.",
+        )
+
+    def handle(self, *args, **options):
+        dataset = {
+            key: options[key]
+            for key in ("categories", "products", "users", "cart_items", "orders")
+        }
+
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            self.stdout.write(f"Seeding {dataset} ...")
+            users = seed_dataset(**dataset)
+            results = run_benchmarks(
+                users,
+                iterations=options["iterations"],
+                scenarios=options["scenarios"] or SCENARIOS,
+                close_connections=options["close_connections"],
+            )
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        self.stdout.write(f"{'scenario':<16}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}{'queries':>9}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<16}{result['rps']:>10}{result['p50_ms']:>10}{result['p99_ms']:>10}{result['queries']:>9}"
+            )
+
+        baseline_path = options["baseline"]
+        if options["save_baseline"]:
+            os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+            save_baseline(baseline_path, results, dataset)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline_path}"))
+            return
+
+        if os.path.exists(baseline_path):
+            regressions = compare_to_baseline(results, load_baseline(baseline_path), options["tolerance"])
+            if regressions:
+                raise CommandError("Regressions against baseline:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from store.exporters import EXPORT_FORMATS, export_lines, order_lines, parse_export_filters
+from store.pagination import InvalidQueryParam
+
+
+class Command(BaseCommand):
+    help = "Stream order lines, optionally filtered by date range and status, as CSV or JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="from", help="First order date (YYYY-MM-DD), inclusive.")
+        parser.add_argument("--to", dest="to", help="Last order date (YYYY-MM-DD), inclusive.")
+        parser.add_argument("--status", help="Comma separated order statuses.")
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--output", "-o", help="Output file (default: stdout).")
+
+    def handle(self, *args, **options):
+        try:
+            filters = parse_export_filters(options)
+        except InvalidQueryParam as exc:
+            raise CommandError(f"--{exc.field}: {exc.message}")
+
+        chunks = export_lines(order_lines(**filters), options["format"])
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", newline="", encoding="utf-8") as fp:
+            for chunk in chunks:
+                fp.write(chunk)
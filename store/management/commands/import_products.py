@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.importers import DEFAULT_CHUNK_SIZE, FEED_FORMATS, detect_format, import_products, read_feed
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a CSV or JSON Lines product feed into the catalog, upserting "
+        "products by sku in chunks. Categories are given by slug."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Feed file, or - for stdin.")
+        parser.add_argument("--format", choices=FEED_FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        feed_format = options["format"] or detect_format(path)
+
+        try:
+            stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+        except OSError as exc:
+            raise CommandError(f"Cannot open {path}: {exc}")
+
+        with stream:
+            result = import_products(
+                read_feed(stream, feed_format),
+                chunk_size=options["chunk_size"],
+                progress=lambda result: self.stdout.write(result.describe()),
+            )
+
+        for error in result.errors:
+            self.stderr.write(error)
+        if result.skipped > len(result.errors):
+            self.stderr.write(f"... and {result.skipped - len(result.errors)} more skipped rows")
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {result.imported} products imported, {result.skipped} rows skipped."
+        ))
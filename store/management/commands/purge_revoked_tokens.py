@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from store.revocation import token_denylist
+
+
+class Command(BaseCommand):
+    help = "Delete revoked tokens that have expired; run it periodically (e.g. daily from cron)."
+
+    def handle(self, *args, **options):
+        deleted = token_denylist.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired revoked tokens."))
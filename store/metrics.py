@@ -0,0 +1,246 @@
+import contextvars
+import hmac
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = contextvars.ContextVar("store_request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Timings and SQL statistics gathered while handling one request."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.query_count = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.statements = Counter()
+        self._serializing = False
+
+    @property
+    def duplicate_queries(self):
+        """Queries whose SQL (ignoring parameters) already ran in this request."""
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_time += time.perf_counter() - started
+            self.query_count += 1
+            self.statements[sql] += 1
+
+    def server_timing(self):
+        return ", ".join([
+            f'db;dur={self.query_time * 1000:.1f};desc="{self.query_count} queries"',
+            f"serializer;dur={self.serializer_time * 1000:.1f}",
+            f"total;dur={self.duration * 1000:.1f}",
+        ])
+
+
+class MetricsRegistry:
+    """
+    Process-wide aggregates per URL name, rendered in the Prometheus text
+    exposition format. Each worker process keeps its own registry.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = Counter()
+        self.latency_buckets = defaultdict(lambda: [0] * len(LATENCY_BUCKETS))
+        self.latency_sum = Counter()
+        self.latency_count = Counter()
+        self.queries = Counter()
+        self.query_seconds = Counter()
+        self.duplicate_queries = Counter()
+        self.serializer_seconds = Counter()
+
+    def observe(self, view, method, status, metrics):
+        with self._lock:
+            self.requests[(view, method, status)] += 1
+            buckets = self.latency_buckets[view]
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if metrics.duration <= bound:
+                    buckets[index] += 1
+            self.latency_sum[view] += metrics.duration
+            self.latency_count[view] += 1
+            self.queries[view] += metrics.query_count
+            self.query_seconds[view] += metrics.query_time
+            self.duplicate_queries[view] += metrics.duplicate_queries
+            self.serializer_seconds[view] += metrics.serializer_time
+
+    def render(self):
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            family("store_requests_total", "counter", "HTTP requests handled, by URL name, method and status.")
+            for (view, method, status), value in sorted(self.requests.items()):
+                lines.append(f'store_requests_total{{view="{view}",method="{method}",status="{status}"}} {value}')
+
+            family("store_request_duration_seconds", "histogram", "Request latency by URL name.")
+            for view in sorted(self.latency_count):
+                for bound, value in zip(LATENCY_BUCKETS, self.latency_buckets[view]):
+                    lines.append(f'store_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} {value}')
+                lines.append(f'store_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {self.latency_count[view]}')
+                lines.append(f'store_request_duration_seconds_sum{{view="{view}"}} {self.latency_sum[view]}')
+                lines.append(f'store_request_duration_seconds_count{{view="{view}"}} {self.latency_count[view]}')
+
+            for name, counter, help_text in (
+                ("store_db_queries_total", self.queries, "SQL queries executed."),
+                ("store_db_query_duration_seconds_total", self.query_seconds, "Time spent executing SQL."),
+                ("store_db_duplicate_queries_total", self.duplicate_queries, "Repeated SQL statements within a request (likely N+1)."),
+                ("store_serializer_duration_seconds_total", self.serializer_seconds, "Time spent in serializer to_representation."),
+            ):
+                family(name, "counter", help_text)
+                for view, value in sorted(counter.items()):
+                    lines.append(f'{name}{{view="{view}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def serializer_timer():
+    """
+    Attribute the enclosed time to the current request's serializer total.
+    Nested serializers are only counted once, by the outermost one.
+    """
+    metrics = _current.get()
+    if metrics is None or metrics._serializing:
+        yield
+        return
+
+    metrics._serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - started
+        metrics._serializing = False
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every database connection. It reports to
+    the metrics of the request in the current context, which also follows
+    async views into the threads their ORM calls run in.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.record_query(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def _install_on_connect(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+class TimedSerializerMixin:
+    """Report the serializer's ``to_representation`` time to the request metrics."""
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, SQL query count/time, duplicate queries and serializer
+    time for every request, keyed by the resolved URL name. Works for both
+    sync and async views. Enabled by ``STORE_METRICS_ENABLED``;
+    ``STORE_SERVER_TIMING`` also adds a ``Server-Timing`` header to each
+    response.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        # Connections opened before this middleware loaded missed the signal
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, "STORE_METRICS_ENABLED", True):
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not getattr(settings, "STORE_METRICS_ENABLED", True):
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        metrics.duration = time.perf_counter() - metrics.started
+        match = getattr(request, "resolver_match", None)
+        view = (match and match.url_name) or "unresolved"
+        registry.observe(view, request.method, response.status_code, metrics)
+
+        if getattr(settings, "STORE_SERVER_TIMING", False):
+            response["Server-Timing"] = metrics.server_timing()
+        return response
+
+
+def metrics_view(request):
+    """
+    Expose the process's request metrics in Prometheus text format to
+    scrapers sending ``Authorization: Bearer <STORE_METRICS_TOKEN>``. Not
+    served at all unless the token is set.
+    """
+    token = getattr(settings, "STORE_METRICS_TOKEN", "")
+    if not token:
+        raise Http404
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(credentials.encode(), token.encode()):
+        response = HttpResponse("Unauthorized", status=401, content_type="text/plain")
+        response["WWW-Authenticate"] = 'Bearer realm="metrics"'
+        return response
+
+    return HttpResponse(
+        registry.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,10 +1,116 @@
-
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
 from django.utils.deprecation import MiddlewareMixin
 
-class DisableCachingMiddleware(MiddlewareMixin):
+from libs.compression import acompress_stream, compress, compress_stream, is_compressible, negotiate
+from store.conditional import CachePolicy
+from store.routers import get_replicas, pin_to_primary, start_replica_reads, stop_replica_reads
+from store.timeouts import set_statement_timeout
+
+
+class CachePolicyMiddleware(MiddlewareMixin):
+    """
+    Applies the ``cache_policy`` declared on the resolved view class.
+    Everything else, including cart and order endpoints, stays private and
+    uncacheable.
+    """
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None)
+        request.cache_policy = getattr(view_class, "cache_policy", CachePolicy.PRIVATE_NO_STORE)
+
+    def process_response(self, request, response):
+        if response.has_header('Cache-Control'):
+            return response
+
+        policy = getattr(request, "cache_policy", CachePolicy.PRIVATE_NO_STORE)
+        response['Cache-Control'] = policy
+        if policy == CachePolicy.PRIVATE_NO_STORE:
+            response['Pragma'] = 'no-cache'
+            response['Expires'] = '0'
+
+        return response
+
+
+class StatementTimeoutMiddleware(MiddlewareMixin):
+    """
+    Applies the per-endpoint ``STORE_STATEMENT_TIMEOUTS`` (milliseconds,
+    keyed by URL name) to the PostgreSQL queries of the request, including
+    those of a streamed body; see store.timeouts. Other database backends
+    are left alone.
+    """
+    def process_request(self, request):
+        # Queries before the view is resolved (sessions, auth) use the default
+        set_statement_timeout(None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        set_statement_timeout(settings.STORE_STATEMENT_TIMEOUTS.get(match.url_name if match else None))
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """
+    Routes the reads of views declaring ``read_from_replica = True`` to a
+    read replica, and pins users to the primary after a successful write
+    request so they read their own writes. Does nothing unless
+    ``STORE_READ_REPLICAS`` is configured.
+    """
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None)
+        if get_replicas() and getattr(view_class, "read_from_replica", False):
+            start_replica_reads(request)
+
     def process_response(self, request, response):
-        response['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-        response['Pragma'] = 'no-cache'
-        response['Expires'] = '0'
+        stop_replica_reads()
+
+        user = getattr(request, "user", None)
+        if (
+            get_replicas()
+            and request.method not in ('GET', 'HEAD', 'OPTIONS')
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            pin_to_primary(user)
+
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses text and JSON responses with brotli or gzip, whichever the
+    client's ``Accept-Encoding`` prefers. Bodies smaller than
+    ``STORE_COMPRESSION_MIN_SIZE`` bytes are sent as they are. Streaming
+    responses are compressed chunk by chunk, so their rows still reach the
+    client as they are read.
+    """
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not is_compressible(response.get('Content-Type', '')):
+            return response
+        if not response.streaming and len(response.content) < settings.STORE_COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
 
+        # The compressed body is a different representation: weaken a strong
+        # ETag (RFC 9110 8.8.1); If-None-Match still matches it
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
         return response
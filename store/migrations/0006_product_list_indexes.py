@@ -0,0 +1,29 @@
+# Generated by Django 5.0 on 2026-10-18 13:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0005_alter_cartitem_unique_together"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["price", "id"], name="store_product_price_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["name", "id"], name="store_product_name_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["created_at", "id"], name="store_product_created_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["category", "price", "id"], name="store_product_cat_price_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-18 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0006_product_list_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["user", "ordered_at", "id"], name="store_order_user_ordered_idx"),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-18 13:54
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_cart_items(apps, schema_editor):
+    """Fold repeated (cart, product) rows into the oldest one before the constraint is added."""
+    CartItem = apps.get_model("store", "CartItem")
+    duplicates = (
+        CartItem.objects.values("cart_id", "product_id")
+        .annotate(rows=Count("id"), keep_id=Min("id"), total=Sum("quantity"))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        CartItem.objects.filter(pk=duplicate["keep_id"]).update(quantity=duplicate["total"])
+        CartItem.objects.filter(
+            cart_id=duplicate["cart_id"],
+            product_id=duplicate["product_id"],
+        ).exclude(pk=duplicate["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0007_order_history_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cart_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="cartitem",
+            constraint=models.UniqueConstraint(fields=("cart", "product"), name="store_cartitem_unique_cart_product"),
+        ),
+    ]
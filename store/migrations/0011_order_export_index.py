@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-18 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0010_product_sku"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["ordered_at", "id"], name="store_order_ordered_idx"),
+        ),
+    ]
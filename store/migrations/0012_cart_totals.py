@@ -0,0 +1,47 @@
+# Generated by Django 5.0 on 2026-10-18 14:18
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_cart_totals(apps, schema_editor):
+    """Compute the new totals of every existing cart from its items."""
+    Cart = apps.get_model("store", "Cart")
+    CartItem = apps.get_model("store", "CartItem")
+    lines = CartItem.objects.filter(cart=OuterRef("pk")).order_by().values("cart")
+    Cart.objects.update(
+        item_count=Coalesce(Subquery(lines.annotate(total=Sum("quantity")).values("total")), Value(0)),
+        subtotal=Coalesce(
+            Subquery(
+                lines.annotate(
+                    total=Sum(F("quantity") * F("product__price"), output_field=models.DecimalField())
+                ).values("total")
+            ),
+            Value(Decimal("0")),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0011_order_export_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cart",
+            name="item_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="cart",
+            name="subtotal",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_cart_totals, migrations.RunPython.noop),
+    ]
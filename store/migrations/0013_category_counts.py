@@ -0,0 +1,41 @@
+# Generated by Django 5.0 on 2026-10-18 14:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_category_counts(apps, schema_editor):
+    """Count the products, and those in stock, of every existing category."""
+    Category = apps.get_model("store", "Category")
+    Product = apps.get_model("store", "Product")
+    products = Product.objects.filter(category=OuterRef("pk")).order_by().values("category")
+    Category.objects.update(
+        product_count=Coalesce(
+            Subquery(products.annotate(total=Count("pk")).values("total")), Value(0)
+        ),
+        in_stock_count=Coalesce(
+            Subquery(products.annotate(total=Count("pk", filter=Q(stock__gt=0))).values("total")), Value(0)
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0012_cart_totals"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="in_stock_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="product_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_category_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.0 on 2026-10-18 14:52
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def fill_slugs(apps, schema_editor):
+    """Give every existing product, and every category without one, a unique slug."""
+    for model_name in ("Category", "Product"):
+        model = apps.get_model("store", model_name)
+        max_length = model._meta.get_field("slug").max_length
+        used = set(model.objects.exclude(slug__isnull=True).exclude(slug="").values_list("slug", flat=True))
+        missing = list(
+            model.objects.filter(models.Q(slug__isnull=True) | models.Q(slug=""))
+            .order_by("id").values_list("pk", "name")
+        )
+        for pk, name in missing:
+            base = slugify(name)[:max_length].strip("-") or model_name.lower()
+            slug, number = base, 1
+            while slug in used:
+                number += 1
+                suffix = f"-{number}"
+                slug = base[:max_length - len(suffix)].rstrip("-") + suffix
+            used.add(slug)
+            model.objects.filter(pk=pk).update(slug=slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0013_category_counts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="slug",
+            field=models.SlugField(blank=True, max_length=200, null=True),
+        ),
+        migrations.RunPython(fill_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="product",
+            name="slug",
+            field=models.SlugField(blank=True, max_length=200, unique=True),
+        ),
+    ]
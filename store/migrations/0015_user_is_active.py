@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 14:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0014_product_slug"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="is_active",
+            field=models.BooleanField(default=True),
+        ),
+    ]
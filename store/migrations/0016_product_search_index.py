@@ -0,0 +1,38 @@
+# Generated by Django 5.0 on 2026-10-18 15:05
+
+from django.db import migrations
+
+
+# Must match store.search.SEARCH_VECTOR_SQL for the planner to use the index
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    """GIN index for the PostgreSQL search backend; other databases don't use one."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = schema_editor.quote_name(apps.get_model("store", "Product")._meta.db_table)
+    schema_editor.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS store_product_search ON {table} USING gin (({SEARCH_VECTOR_SQL}))"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS store_product_search")
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY can't run in a transaction; it keeps the table writable
+    atomic = False
+
+    dependencies = [
+        ("store", "0015_user_is_active"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
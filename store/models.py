@@ -4,18 +4,22 @@ from django.contrib.auth.models import (
     BaseUserManager,
     PermissionsMixin,
 )
-from store.abstract import AbstractAuditCreator, AbstractAuditUpdater
+from store.abstract import AbstractAuditCreator, AbstractAuditUpdater, AutoSlugMixin
 from store import STATUSCHOICES
 
 # Create your models here.
 
 class UserManager(BaseUserManager):
-    def create_user(self, email, name, password=None, **extra_fields):
+    def create_user(self, email, name, password=None, encoded_password=None, **extra_fields):
+        """Pass ``encoded_password`` instead of ``password`` if it is already hashed."""
         if not email:
             raise ValueError("Email is mandatory")
         email = self.normalize_email(email)
         user = self.model(email=email, name=name, **extra_fields)
-        user.set_password(password)
+        if encoded_password is not None:
+            user.password = encoded_password
+        else:
+            user.set_password(password)
         user.save(using=self._db)
         return user
 
@@ -33,6 +37,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_admin = models.BooleanField(default=False)
     is_creator = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False)
+    is_active = models.BooleanField(default=True)
 
     objects = UserManager()
 
@@ -47,10 +52,10 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name_plural = "1. Users"
 
 
-class Category(AbstractAuditCreator, AbstractAuditUpdater):
+class Category(AutoSlugMixin, AbstractAuditCreator, AbstractAuditUpdater):
     """
-    Represents a product category with a unique slug.
-    Used to classify and group products.
+    Represents a product category with a unique slug, generated from the
+    name when left blank. Used to classify and group products.
     """
     name = models.CharField(
         max_length=128, 
@@ -60,6 +65,10 @@ class Category(AbstractAuditCreator, AbstractAuditUpdater):
         unique=True, 
         blank=True
     )
+    # Materialized summary, kept current by store.services.refresh_category_counts
+    # and the stock updates
+    product_count = models.PositiveIntegerField(default=0)
+    in_stock_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -69,12 +78,25 @@ class Category(AbstractAuditCreator, AbstractAuditUpdater):
         verbose_name_plural = "2. Categories"
 
 
-class Product(AbstractAuditCreator, AbstractAuditUpdater):
+class Product(AutoSlugMixin, AbstractAuditCreator, AbstractAuditUpdater):
     """
     Represents a product available for purchase, including price, stock,
     and relationships to category and creator (user).
     """
     name = models.CharField(max_length=255)
+    # Short enough for the slug cache keys to stay within memcached's limit
+    slug = models.SlugField(
+        max_length=200,
+        unique=True,
+        blank=True
+    )
+    # Supplier stock keeping unit; the key product feeds are upserted on
+    sku = models.CharField(
+        max_length=64,
+        unique=True,
+        blank=True,
+        null=True
+    )
     description = models.TextField(
         blank=True, 
         null=True
@@ -103,6 +125,13 @@ class Product(AbstractAuditCreator, AbstractAuditUpdater):
     class Meta:
         verbose_name = "Product"
         verbose_name_plural = "3. Products"
+        # Composite (sort_key, id) indexes backing the keyset-paginated product list
+        indexes = [
+            models.Index(fields=["price", "id"], name="store_product_price_id_idx"),
+            models.Index(fields=["name", "id"], name="store_product_name_id_idx"),
+            models.Index(fields=["created_at", "id"], name="store_product_created_id_idx"),
+            models.Index(fields=["category", "price", "id"], name="store_product_cat_price_idx"),
+        ]
 
 
 class Cart(AbstractAuditCreator, AbstractAuditUpdater):
@@ -113,6 +142,9 @@ class Cart(AbstractAuditCreator, AbstractAuditUpdater):
         User, on_delete=models.CASCADE,
         related_name="%(app_label)s_%(class)s_user"
     )
+    # Kept in step with the cart items by store.services.refresh_cart_totals
+    item_count = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
     def __str__(self):
         return str(self.user)
@@ -145,6 +177,24 @@ class CartItem(AbstractAuditCreator, AbstractAuditUpdater):
     class Meta:
         verbose_name = "Cart Item"
         verbose_name_plural = "5. Cart Items"
+        # Conflict target for the add-to-cart upsert
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cart", "product"],
+                name="store_cartitem_unique_cart_product"
+            ),
+        ]
+
+
+class OrderQuerySet(models.QuerySet):
+    def with_items(self):
+        """Load each order's items and their products in two extra queries total."""
+        return self.prefetch_related(
+            models.Prefetch(
+                "store_orderitem_order",
+                queryset=OrderItem.objects.select_related("product").order_by("id"),
+            )
+        )
 
 
 class Order(AbstractAuditCreator, AbstractAuditUpdater):
@@ -168,12 +218,20 @@ class Order(AbstractAuditCreator, AbstractAuditUpdater):
         related_name="%(app_label)s_%(class)s_user"
     )
 
+    objects = OrderQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.user} - {self.status}"
 
     class Meta:
         verbose_name = "Order"
         verbose_name_plural = "6. Orders"
+        # Backs the keyset-paginated order history
+        indexes = [
+            models.Index(fields=["user", "ordered_at", "id"], name="store_order_user_ordered_idx"),
+            # Date-range scans for the finance export
+            models.Index(fields=["ordered_at", "id"], name="store_order_ordered_idx"),
+        ]
 
 
 class OrderItem(AbstractAuditCreator, AbstractAuditUpdater):
@@ -206,3 +264,20 @@ class OrderItem(AbstractAuditCreator, AbstractAuditUpdater):
         verbose_name = "Order Item"
         verbose_name_plural = "7. Order Items"
 
+
+
+class RevokedToken(models.Model):
+    """
+    A JWT revoked before its expiry (logout, refresh rotation). Rows are
+    only needed until ``expires_at``; purge_revoked_tokens removes the rest.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.jti
+
+    class Meta:
+        verbose_name = "Revoked Token"
+        verbose_name_plural = "8. Revoked Tokens"
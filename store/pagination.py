@@ -0,0 +1,176 @@
+import base64
+import json
+from decimal import Decimal
+from itertools import islice
+
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Rows fetched from the database, and serialized, at a time when streaming
+STREAM_CHUNK_SIZE = 500
+
+
+class InvalidQueryParam(Exception):
+    """Raised when a list endpoint query parameter is invalid."""
+    def __init__(self, field, message):
+        self.field = field
+        self.message = message
+        super().__init__(message)
+
+
+class InvalidCursor(InvalidQueryParam):
+    """Raised when a client supplies a cursor that cannot be decoded."""
+    def __init__(self, message="Invalid pagination cursor."):
+        super().__init__("cursor", message)
+
+
+class KeysetPage:
+    """
+    A single page of results produced by KeysetPaginator.
+    """
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Cursor based pagination over a ``(sort_field, id)`` key.
+
+    Instead of skipping rows with OFFSET, every page is fetched with a
+    ``WHERE (sort_field, id) > (last_value, last_id)`` condition, so page N
+    costs the same index range scan as page 1. The cursor handed to the
+    client is an opaque url-safe token encoding the last row's key.
+    """
+    def __init__(self, queryset, sort_field="id", descending=False, page_size=DEFAULT_PAGE_SIZE):
+        self.queryset = queryset
+        self.sort_field = sort_field
+        self.descending = descending
+        self.page_size = page_size
+
+    @property
+    def ordering(self):
+        prefix = "-" if self.descending else ""
+        if self.sort_field == "id":
+            return [f"{prefix}id"]
+        return [f"{prefix}{self.sort_field}", f"{prefix}id"]
+
+    def paginate(self, cursor=None):
+        return self._build_page(list(self._page_queryset(cursor)))
+
+    async def apaginate(self, cursor=None):
+        """Async counterpart of paginate() using the async ORM."""
+        return self._build_page([obj async for obj in self._page_queryset(cursor)])
+
+    def stream(self, cursor=None, using=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Every row after ``cursor``, in page order, as lists of up to
+        ``chunk_size`` rows read through one database iterator (a
+        server-side cursor on PostgreSQL) instead of page by page. The
+        cursor is checked here, before anything is read.
+        """
+        return _batched(self._ordered_queryset(cursor, using).iterator(chunk_size=chunk_size), chunk_size)
+
+    def astream(self, cursor=None, using=None, chunk_size=STREAM_CHUNK_SIZE):
+        """Async counterpart of stream()."""
+        return _abatched(self._ordered_queryset(cursor, using).aiterator(chunk_size=chunk_size), chunk_size)
+
+    def _ordered_queryset(self, cursor, using=None):
+        queryset = self.queryset.order_by(*self.ordering)
+        if using:
+            queryset = queryset.using(using)
+        if cursor:
+            queryset = queryset.filter(self._after(*self.decode_cursor(cursor)))
+        return queryset
+
+    def _page_queryset(self, cursor):
+        return self._ordered_queryset(cursor)[:self.page_size + 1]
+
+    def _build_page(self, items):
+        next_cursor = None
+        if len(items) > self.page_size:
+            items = items[:self.page_size]
+            next_cursor = self.encode_cursor(items[-1])
+
+        return KeysetPage(items, next_cursor)
+
+    def _after(self, value, pk):
+        lookup = "lt" if self.descending else "gt"
+        if self.sort_field == "id":
+            return Q(**{f"id__{lookup}": pk})
+        return (
+            Q(**{f"{self.sort_field}__{lookup}": value})
+            | Q(**{self.sort_field: value, f"id__{lookup}": pk})
+        )
+
+    def encode_cursor(self, obj):
+        # Pages of values() rows are dicts
+        if isinstance(obj, dict):
+            value, pk = obj[self.sort_field], obj["id"]
+        else:
+            value, pk = getattr(obj, self.sort_field), obj.pk
+        if isinstance(value, Decimal):
+            value = str(value)
+        elif hasattr(value, "isoformat"):
+            value = value.isoformat()
+        raw = json.dumps([value, pk], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            field = self.queryset.model._meta.get_field(self.sort_field)
+            return field.to_python(value), int(pk)
+        except Exception as exc:
+            raise InvalidCursor() from exc
+
+
+def _batched(rows, size):
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+async def _abatched(rows, size):
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def get_stream_flag(value):
+    """Whether a ``stream`` query param asks for the whole list streamed."""
+    return (value or "").lower() in ("1", "true", "yes")
+
+
+def get_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Clamp a client supplied ``page_size`` query param to ``[1, maximum]``."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum))
+
+
+def get_page_number(value):
+    """Parse a 1-based ``page`` query param, defaulting to the first page."""
+    if value in (None, ""):
+        return 1
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = 0
+    if number < 1:
+        raise InvalidQueryParam("page", "Enter a positive integer.")
+    return number
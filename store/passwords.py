@@ -0,0 +1,115 @@
+"""
+Password hashing off the request thread.
+
+Hashing is CPU bound and deliberately slow, so during a login storm it
+starves every other request on the same worker. With
+``STORE_PASSWORD_HASH_WORKERS`` set, hashes are computed in a process pool
+instead, so they use every core and do not hold the GIL of the web
+worker. At most ``STORE_PASSWORD_HASH_MAX_PENDING`` hashes may be running
+or queued per web worker. Beyond that HashingBusy is raised, and the
+views answer 503 instead of letting the queue (and latency) grow without
+bound.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class HashingBusy(Exception):
+    """Raised when too many password hashes are already pending."""
+
+
+def _initialize_worker():
+    django.setup()
+
+
+def _check_password(password, encoded):
+    """Return ``(valid, new_encoded)``; new_encoded is set when the hash needs an upgrade."""
+    updated = []
+    valid = check_password(password, encoded, setter=lambda raw: updated.append(make_password(raw)))
+    return valid, (updated[0] if updated else None)
+
+
+class PasswordHasherPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+
+    @property
+    def workers(self):
+        return getattr(settings, "STORE_PASSWORD_HASH_WORKERS", 0)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn rather than fork: forking a threaded web worker is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initialize_worker,
+                )
+                self._slots = threading.BoundedSemaphore(
+                    getattr(settings, "STORE_PASSWORD_HASH_MAX_PENDING", self.workers * 4)
+                )
+            return self._executor
+
+    def run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+
+        executor = self._get_executor()
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def make_password(self, password):
+        return self.run(make_password, password)
+
+    def check_password(self, password, encoded):
+        return self.run(_check_password, password, encoded)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+password_hasher = PasswordHasherPool()
+
+
+def authenticate_user(email, password):
+    """
+    Return the active user with these credentials, or None. Equivalent to
+    ``authenticate()`` with the model backend, but hashes through
+    password_hasher. A hash created with an outdated hasher or cost is
+    replaced with one from the preferred hasher.
+    """
+    user_model = get_user_model()
+    try:
+        user = user_model._default_manager.get_by_natural_key(email)
+    except user_model.DoesNotExist:
+        # Hash anyway so response time does not reveal whether the email exists
+        password_hasher.make_password(password)
+        return None
+
+    valid, new_encoded = password_hasher.check_password(password, user.password)
+    if not valid or not user.is_active:
+        return None
+
+    if new_encoded is not None:
+        user.password = new_encoded
+        user.save(update_fields=["password"])
+    return user
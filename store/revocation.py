@@ -0,0 +1,176 @@
+"""
+JWT revocation.
+
+Revoked token ids (``jti``) are stored in RevokedToken, the source of
+truth, and in the store cache. Each process also keeps a bloom filter of
+all unexpired revoked ids, so checking a token on every request costs one
+cache read (the denylist version) and a few bit lookups. Only tokens the
+filter flags as possibly revoked are confirmed against the cache, and then
+the database.
+
+A revocation bumps the shared version. On its next request every process
+adds the rows revoked since its last load (an id range read of a few rows)
+to its filter. The filter is only rebuilt from scratch when it was never
+loaded or holds more ids than it is sized for, which also drops expired
+ones. The version lives in the store cache, so revocations only reach
+other processes when ``CACHE_URL`` points at a cache they share.
+"""
+import hashlib
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from store.cache import denylist_cache, get_store_cache
+from store.models import RevokedToken
+
+
+# Ids below the highest loaded one that are read again on every load. A
+# row whose transaction commits after a higher id was already loaded is
+# still picked up, as long as fewer than this many rows were revoked in
+# between.
+ID_OVERLAP = 100
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings using double hashing."""
+    def __init__(self, bits=1 << 20, hashes=7):
+        self.bits = bits
+        self.hashes = hashes
+        self.array = bytearray((bits + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * step) % self.bits for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.array[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenDenylist:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._version = None
+        self._last_id = 0
+        # Ids added to the filter since it was last built from scratch
+        self._added = 0
+
+    @property
+    def capacity(self):
+        # About 1% false positives with 7 hashes
+        return getattr(settings, "STORE_TOKEN_DENYLIST_BITS", 1 << 20) // 10
+
+    def entry_key(self, jti):
+        return f"store:denylist:jti:{jti}"
+
+    def revoke(self, token):
+        """
+        Revoke ``token`` until it expires. Returns False if it already was,
+        which is how refresh rotation detects a reused refresh token.
+        """
+        jti = token[api_settings.JTI_CLAIM]
+        expires_at = datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc)
+        _, created = RevokedToken.objects.get_or_create(jti=jti, defaults={"expires_at": expires_at})
+
+        ttl = max(1, int((expires_at - timezone.now()).total_seconds()))
+        get_store_cache().set(self.entry_key(jti), True, ttl)
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+        denylist_cache.invalidate(["filter"])
+        return created
+
+    def is_revoked(self, jti):
+        version = denylist_cache.get_version("filter")
+        if version != self._version:
+            self.refresh(version)
+        if jti not in self._filter:
+            return False
+        return self._confirm(jti)
+
+    async def ais_revoked(self, jti):
+        """Async is_revoked(); the database is only touched off the event loop."""
+        version = await denylist_cache.aget_version("filter")
+        if version != self._version:
+            await sync_to_async(self.refresh)(version)
+        if jti not in self._filter:
+            return False
+        return await sync_to_async(self._confirm)(jti)
+
+    def refresh(self, version):
+        """Bring the filter up to ``version``, loading only what it is missing."""
+        if self._filter is None or self._added >= self.capacity:
+            self.rebuild(version)
+        else:
+            self.load_new(version)
+
+    def load_new(self, version):
+        """Add the ids revoked since the last load to the filter."""
+        # Always the primary: a lagging replica could miss a fresh logout
+        rows = list(
+            RevokedToken.objects.using(DEFAULT_DB_ALIAS)
+            .filter(id__gt=self._last_id - ID_OVERLAP)
+            .values_list("id", "jti")
+        )
+        with self._lock:
+            for pk, jti in rows:
+                self._filter.add(jti)
+                if pk > self._last_id:
+                    self._added += 1
+            self._last_id = max([self._last_id, *(pk for pk, _ in rows)])
+            self._version = version
+
+    def rebuild(self, version):
+        """Build a new filter from every unexpired revoked id."""
+        bloom = BloomFilter(getattr(settings, "STORE_TOKEN_DENYLIST_BITS", 1 << 20))
+        revoked = RevokedToken.objects.using(DEFAULT_DB_ALIAS)
+        last_id = revoked.aggregate(last_id=Max("id"))["last_id"] or 0
+        added = 0
+        jtis = revoked.filter(id__lte=last_id, expires_at__gt=timezone.now()).values_list("jti", flat=True)
+        for jti in jtis.iterator(chunk_size=2000):
+            bloom.add(jti)
+            added += 1
+
+        with self._lock:
+            self._filter = bloom
+            self._last_id = last_id
+            self._added = added
+            self._version = version
+
+    def _confirm(self, jti):
+        # Filter hits are revoked tokens or rare false positives; remember
+        # the answer so a false positive costs one query, not one per request
+        cache = get_store_cache()
+        revoked = cache.get(self.entry_key(jti))
+        if revoked is None:
+            revoked = (
+                RevokedToken.objects.using(DEFAULT_DB_ALIAS)
+                .filter(jti=jti, expires_at__gt=timezone.now())
+                .exists()
+            )
+            cache.set(self.entry_key(jti), revoked, denylist_cache.timeout)
+        return revoked
+
+    def purge_expired(self):
+        """
+        Delete revoked tokens that have expired anyway; returns the count.
+        Filters keep their ids, which can only cause a confirmed false
+        positive, until they are next rebuilt.
+        """
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+
+token_denylist = TokenDenylist()
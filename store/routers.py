@@ -0,0 +1,86 @@
+"""
+Read-replica routing.
+
+Views opt in with ``read_from_replica = True``; ReplicaRoutingMiddleware
+then marks the request so ReplicaRouter sends its reads to one of the
+``STORE_READ_REPLICAS`` aliases. Every write, and every read outside an
+opted-in view, stays on ``default``.
+
+Replicas lag behind the primary, so after a user's successful write
+request the user is pinned to the primary for
+``STORE_REPLICA_PIN_SECONDS`` and keeps reading their own writes.
+"""
+import contextvars
+import random
+
+from django.conf import settings
+
+from store.cache import get_store_cache
+
+
+_routing = contextvars.ContextVar("store_replica_routing", default=None)
+
+
+def get_replicas():
+    return getattr(settings, "STORE_READ_REPLICAS", [])
+
+
+def pin_key(user_id):
+    return f"store:replica-pin:{user_id}"
+
+
+def pin_to_primary(user):
+    """Route ``user``'s replica reads to the primary until replicas catch up."""
+    get_store_cache().set(pin_key(user.pk), True, getattr(settings, "STORE_REPLICA_PIN_SECONDS", 5))
+
+
+class ReplicaRouting:
+    """Replica choice for one request, resolved lazily on its first read."""
+    def __init__(self, request):
+        self.request = request
+        self.alias = random.choice(get_replicas())
+        self._pinned = None
+
+    def read_alias(self):
+        if self.pinned():
+            return "default"
+        return self.alias
+
+    def pinned(self):
+        if self._pinned is not None:
+            return self._pinned
+
+        # Authentication runs inside the view, so the user is only known
+        # (and the answer only worth remembering) once it has happened
+        user = getattr(self.request, "user", None)
+        if user is None or not user.is_authenticated:
+            return False
+        self._pinned = bool(get_store_cache().get(pin_key(user.pk)))
+        return self._pinned
+
+
+def start_replica_reads(request):
+    _routing.set(ReplicaRouting(request))
+
+
+def stop_replica_reads():
+    _routing.set(None)
+
+
+class ReplicaRouter:
+    """
+    Sends reads from replica-enabled requests to a replica; everything else
+    falls through to Django's default routing.
+    """
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None:
+            return None
+        return routing.read_alias()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
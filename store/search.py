@@ -0,0 +1,241 @@
+import bisect
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connection, connections
+from django.db.models.expressions import RawSQL
+
+from store.cache import catalog_cache
+from store.models import Product
+
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Term frequency weights per field; a hit in the name counts for more
+NAME_WEIGHT = 3
+DESCRIPTION_WEIGHT = 1
+
+# The weighted document of the database backend. It must stay identical to
+# the expression of the store_product_search GIN index (migration 0016) for
+# PostgreSQL to use the index. The "simple" configuration doesn't stem,
+# like tokenize().
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class ProductSearchIndex:
+    """
+    In-process inverted index over ``Product.name`` and ``description``.
+
+    ``postings`` maps each token to ``{product_id: weight}`` and ``tokens`` is
+    kept sorted so that prefix matches are a bisect plus a short scan. Every
+    query term must match (the last one as a prefix, for search-as-you-type)
+    and results are ranked by weighted term frequency times IDF.
+
+    Writes in this process are applied incrementally. Other processes notice
+    the change through the shared "search" catalog version and rebuild in
+    the background, answering queries from the previous index meanwhile.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.postings = defaultdict(dict)
+        self.tokens = []
+        self.documents = {}
+        self.version = None
+        self._building = False
+
+    def build(self):
+        """Index every product, then swap the new index in."""
+        version = catalog_cache.get_version("search")
+        fresh = ProductSearchIndex()
+        # Always the primary: the index is marked with the version read above
+        rows = Product.objects.using(DEFAULT_DB_ALIAS).values_list("id", "name", "description")
+        for product_id, name, description in rows.iterator(chunk_size=2000):
+            fresh._add(product_id, name, description)
+
+        with self._lock:
+            self.postings, self.tokens, self.documents = fresh.postings, fresh.tokens, fresh.documents
+            self.version = version
+
+    def warm(self):
+        """Build the index at startup; if the database isn't ready the first query does."""
+        if use_database_search():
+            return
+        try:
+            self.build()
+        except DatabaseError:
+            pass
+        finally:
+            # Don't hand an open connection to forked workers
+            connections.close_all()
+
+    def ensure_current(self):
+        """
+        Catch up with the shared version. Only the first build runs on the
+        calling thread; later ones run in the background so no request
+        waits for (or times out on) a scan of the whole catalog.
+        """
+        if self.version == catalog_cache.get_version("search"):
+            return
+        if self.version is None:
+            self.build()
+        else:
+            self.rebuild_in_background()
+
+    def rebuild_in_background(self):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self._background_build, name="product-search-index", daemon=True).start()
+
+    def _background_build(self):
+        try:
+            self.build()
+        except DatabaseError:
+            # The next query that finds the index stale tries again
+            pass
+        finally:
+            with self._lock:
+                self._building = False
+            connections.close_all()
+
+    def update(self, product_id, name=None, description=None, deleted=False):
+        """
+        Apply a committed product write made by this process and publish it
+        to other processes by bumping the shared version. The index only
+        stays current if nobody else bumped it since it was last current;
+        otherwise it is left for the next query to rebuild.
+        """
+        with self._lock:
+            version = catalog_cache.bump_version("search")
+            if self.version is None or version != self.version + 1:
+                return
+
+            self._remove(product_id)
+            if not deleted:
+                self._add(product_id, name, description)
+            self.version = version
+
+    def _add(self, product_id, name, description):
+        weights = Counter()
+        for token in tokenize(name):
+            weights[token] += NAME_WEIGHT
+        for token in tokenize(description):
+            weights[token] += DESCRIPTION_WEIGHT
+
+        for token, weight in weights.items():
+            postings = self.postings[token]
+            if not postings:
+                bisect.insort(self.tokens, token)
+            postings[product_id] = weight
+        self.documents[product_id] = list(weights)
+
+    def _remove(self, product_id):
+        for token in self.documents.pop(product_id, ()):
+            postings = self.postings[token]
+            postings.pop(product_id, None)
+            if not postings:
+                del self.postings[token]
+                index = bisect.bisect_left(self.tokens, token)
+                if index < len(self.tokens) and self.tokens[index] == token:
+                    del self.tokens[index]
+
+    def _expand(self, term):
+        start = bisect.bisect_left(self.tokens, term)
+        for token in self.tokens[start:]:
+            if not token.startswith(term):
+                break
+            yield token
+
+    def search(self, query, limit):
+        """Return up to ``limit`` product ids matching ``query``, best first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            total = max(len(self.documents), 1)
+            scores = None
+            for position, term in enumerate(terms):
+                if position == len(terms) - 1:
+                    candidates = list(self._expand(term))
+                else:
+                    candidates = [term] if term in self.postings else []
+
+                term_scores = defaultdict(float)
+                for token in candidates:
+                    postings = self.postings[token]
+                    idf = math.log(1 + total / len(postings))
+                    for product_id, weight in postings.items():
+                        term_scores[product_id] += weight * idf
+
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        product_id: score + term_scores[product_id]
+                        for product_id, score in scores.items()
+                        if product_id in term_scores
+                    }
+                if not scores:
+                    return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [product_id for product_id, _ in ranked[:limit]]
+
+
+product_search_index = ProductSearchIndex()
+
+
+def use_database_search():
+    return (
+        getattr(settings, "STORE_SEARCH_BACKEND", "memory") == "database"
+        and connection.vendor == "postgresql"
+    )
+
+
+def _database_search(query, limit):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+
+    terms = tokenize(query)
+    if not terms:
+        return []
+
+    # Prefix match on the last term, mirroring the in-memory index
+    raw = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+    search_query = SearchQuery(raw, search_type="raw", config="simple")
+    vector = RawSQL(SEARCH_VECTOR_SQL, [], output_field=SearchVectorField())
+    # The @@ match is answered by the GIN index; only matches are ranked
+    return list(
+        Product.objects.annotate(document=vector)
+        .filter(document=search_query)
+        .annotate(rank=SearchRank(vector, search_query))
+        .order_by("-rank", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+
+
+def search_products(query, limit):
+    """
+    Return up to ``limit`` products matching ``query`` in rank order.
+    Uses PostgreSQL full-text search when ``STORE_SEARCH_BACKEND`` is
+    "database", and the in-process index otherwise.
+    """
+    if use_database_search():
+        product_ids = _database_search(query, limit)
+    else:
+        product_search_index.ensure_current()
+        product_ids = product_search_index.search(query, limit)
+
+    products = Product.objects.in_bulk(product_ids)
+    return [products[product_id] for product_id in product_ids if product_id in products]
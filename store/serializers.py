@@ -1,5 +1,8 @@
 from rest_framework import serializers
+from store.fast_serializers import FastSerializer
+from store.metrics import TimedSerializerMixin
 from store.models import Category, Order, OrderItem, Product, User
+from store.passwords import password_hasher
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -10,7 +13,11 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ["email", "name", "password"]
 
     def create(self, validated_data):
-        return User.objects.create_user(**validated_data)
+        password = validated_data.pop("password")
+        return User.objects.create_user(
+            encoded_password=password_hasher.make_password(password),
+            **validated_data
+        )
 
 
 class LoginSerializer(serializers.Serializer):
@@ -18,62 +25,55 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
 
 
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
+
 class ProductCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
-        fields = ["id", "name", "description", "price", "stock", "category", "image"]
+        fields = ["id", "name", "slug", "description", "price", "stock", "category", "image"]
 
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source="category.name", read_only=True)
 
     class Meta:
         model = Product
-        fields = ["id", "name", "description", "price", "stock", "category_name", "image"]
-
+        fields = ["id", "name", "slug", "description", "price", "stock", "category_name", "image"]
 
-class ProductListSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Product
-        fields = ['id', 'name', 'description', 'price', 'stock', 'image']
 
+class ProductDetailDataSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """The product detail endpoint payload; ``category`` is the category name."""
+    category = serializers.CharField(source="category.name", read_only=True)
 
-class CategorySerializer(serializers.ModelSerializer):
     class Meta:
-        model = Category
-        fields = ['id', 'name', 'slug']
+        model = Product
+        fields = ["id", "name", "slug", "price", "stock", "description", "category", "image"]
 
 
-class ProductInOrderSerializer(serializers.ModelSerializer):
+class ProductListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
-        fields = ["id", "name", "price"]
+        fields = ['id', 'name', 'slug', 'description', 'price', 'stock', 'image']
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
-    product = ProductInOrderSerializer()
+class CartLineSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
 
-    class Meta:
-        model = OrderItem
-        fields = ["id", "product", "quantity", "price_at_order_time"]
 
+class BatchAddToCartSerializer(serializers.Serializer):
+    items = CartLineSerializer(many=True, allow_empty=False)
 
-class OrderHistorySerializer(serializers.ModelSerializer):
-    items = serializers.SerializerMethodField()
 
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
-        model = Order
-        fields = ["id", "total_amount", "status", "ordered_at", "items"]
-
-    def get_items(self, obj):
-        order_items = OrderItem.objects.filter(order=obj)
-        return OrderItemSerializer(
-            order_items,
-            many=True
-        ).data
+        model = Category
+        fields = ['id', 'name', 'slug']
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source="product.name", read_only=True)
 
     class Meta:
@@ -81,7 +81,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = ["id", "product", "product_name", "quantity", "price_at_order_time"]
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(
         source="store_orderitem_order", many=True, read_only=True
     )
@@ -89,3 +89,9 @@ class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ["id", "total_amount", "status", "ordered_at", "items"]
+
+
+# values()-based equivalents of the above for the read-only endpoints
+fast_product_list = FastSerializer(ProductListSerializer)
+fast_product_detail = FastSerializer(ProductDetailDataSerializer)
+fast_order = FastSerializer(OrderSerializer)
@@ -0,0 +1,286 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import (
+    Case,
+    Count,
+    DecimalField,
+    F,
+    OuterRef,
+    PositiveIntegerField,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from store import STATUSCHOICES
+from store.cache import catalog_cache, product_cache
+from store.models import Cart, CartItem, Category, Order, OrderItem, Product
+
+
+class EmptyCart(Exception):
+    """Raised when a checkout finds no matching items in the cart."""
+
+
+class InsufficientStock(Exception):
+    """
+    Raised when one or more lines cannot be fulfilled from current stock.
+    ``shortfalls`` lists every failing line, not only the first one.
+    """
+    def __init__(self, shortfalls):
+        self.shortfalls = shortfalls
+        super().__init__("Not enough stock available.")
+
+
+def merge_lines(lines):
+    """
+    Collapse ``(product_id, quantity)`` pairs into a ``{product_id: quantity}``
+    dict, summing quantities for repeated products.
+    """
+    merged = defaultdict(int)
+    for product_id, quantity in lines:
+        merged[product_id] += quantity
+    return dict(merged)
+
+
+def _requested(lines):
+    return Case(
+        *[When(pk=product_id, then=Value(quantity)) for product_id, quantity in lines.items()],
+        output_field=PositiveIntegerField(),
+    )
+
+
+def decrement_stock(lines):
+    """
+    Atomically take ``{product_id: quantity}`` out of stock.
+
+    All lines are applied by a single conditional UPDATE
+    (``SET stock = stock - n WHERE stock >= n``), so concurrent requests can
+    never oversell and no row is read into Python first. Either every line is
+    decremented or none is; in the latter case InsufficientStock reports each
+    line that was short.
+    """
+    lines = {product_id: quantity for product_id, quantity in lines.items() if quantity > 0}
+    if not lines:
+        return
+
+    requested = _requested(lines)
+    with transaction.atomic():
+        updated = Product.objects.filter(
+            pk__in=lines,
+            stock__gte=requested,
+        ).update(stock=F("stock") - requested)
+
+        if updated != len(lines):
+            raise InsufficientStock(get_shortfalls(lines))
+
+        product_cache.invalidate(lines)
+        catalog_cache.invalidate(["products"])
+        # Lines now at zero were in stock a moment ago
+        _shift_in_stock_counts(Product.objects.filter(pk__in=lines, stock=0), -1)
+
+
+def increment_stock(lines):
+    """Return ``{product_id: quantity}`` to stock in a single UPDATE."""
+    lines = {product_id: quantity for product_id, quantity in lines.items() if quantity > 0}
+    if not lines:
+        return
+
+    requested = _requested(lines)
+    Product.objects.filter(pk__in=lines).update(stock=F("stock") + requested)
+    product_cache.invalidate(lines)
+    catalog_cache.invalidate(["products"])
+    # Lines whose stock is exactly what was returned were out of stock before
+    _shift_in_stock_counts(Product.objects.filter(pk__in=lines, stock=requested), 1)
+
+
+def _shift_in_stock_counts(products, delta):
+    """
+    Add ``delta`` to the in-stock count of each category once per product in
+    ``products`` (those that just crossed zero stock), in one UPDATE that
+    only touches their categories.
+    """
+    crossed = (
+        products.filter(category=OuterRef("pk")).order_by().values("category")
+        .annotate(total=Count("pk")).values("total")
+    )
+    updated = Category.objects.filter(pk__in=products.values("category")).update(
+        in_stock_count=F("in_stock_count") + delta * Subquery(crossed)
+    )
+    if updated:
+        catalog_cache.invalidate(["categories"])
+
+
+def refresh_category_counts(categories):
+    """
+    Recompute ``product_count`` and ``in_stock_count`` for ``categories``
+    (category ids or a queryset of them) in a single UPDATE.
+    """
+    products = Product.objects.filter(category=OuterRef("pk")).order_by().values("category")
+    counts = products.annotate(total=Count("pk"))
+    in_stock = products.annotate(total=Count("pk", filter=Q(stock__gt=0)))
+
+    Category.objects.filter(pk__in=categories).update(
+        product_count=Coalesce(Subquery(counts.values("total")), Value(0)),
+        in_stock_count=Coalesce(Subquery(in_stock.values("total")), Value(0)),
+    )
+    catalog_cache.invalidate(["categories"])
+
+
+def get_shortfalls(lines):
+    """Describe every line in ``{product_id: quantity}`` that exceeds current stock."""
+    products = {
+        product_id: (name, stock)
+        for product_id, name, stock in Product.objects.filter(
+            pk__in=lines
+        ).values_list("id", "name", "stock")
+    }
+
+    shortfalls = []
+    for product_id, quantity in lines.items():
+        name, available = products.get(product_id, (None, 0))
+        if available < quantity:
+            shortfalls.append({
+                "product_id": product_id,
+                "product_name": name,
+                "requested": quantity,
+                "available": available,
+            })
+    return shortfalls
+
+
+def upsert_cart_items(cart, lines):
+    """
+    Add ``{product_id: quantity}`` to ``cart``, merging with existing lines.
+
+    On databases with ``INSERT ... ON CONFLICT`` support (PostgreSQL,
+    SQLite) every line is written by one statement that bumps the quantity of
+    lines already in the cart. Returns ``{product_id: new_quantity}``.
+    """
+    features = connection.features
+    if not (features.supports_update_conflicts_with_target and features.can_return_rows_from_bulk_insert):
+        return _upsert_cart_items_fallback(cart, lines)
+
+    qn = connection.ops.quote_name
+    table = qn(CartItem._meta.db_table)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    params = []
+    for product_id, quantity in lines.items():
+        params += [cart.pk, product_id, quantity, now, now]
+
+    sql = (
+        f"INSERT INTO {table} ({qn('cart_id')}, {qn('product_id')}, {qn('quantity')}, "
+        f"{qn('created_at')}, {qn('updated_at')}) "
+        f"VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(lines))} "
+        f"ON CONFLICT ({qn('cart_id')}, {qn('product_id')}) "
+        f"DO UPDATE SET {qn('quantity')} = {table}.{qn('quantity')} + EXCLUDED.{qn('quantity')} "
+        f"RETURNING {qn('product_id')}, {qn('quantity')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return dict(cursor.fetchall())
+
+
+def _upsert_cart_items_fallback(cart, lines):
+    for product_id, quantity in lines.items():
+        updated = CartItem.objects.filter(cart=cart, product_id=product_id).update(
+            quantity=F("quantity") + quantity
+        )
+        if not updated:
+            CartItem.objects.create(cart=cart, product_id=product_id, quantity=quantity)
+    return dict(
+        CartItem.objects.filter(cart=cart, product_id__in=lines).values_list("product_id", "quantity")
+    )
+
+
+def refresh_cart_totals(carts):
+    """
+    Recompute ``item_count`` and ``subtotal`` for ``carts`` (cart ids or a
+    queryset of them) from their items and current product prices, in a
+    single UPDATE. Called after every change to cart items and to the price
+    of a product sitting in carts, so reading the totals never needs the
+    items.
+    """
+    lines = CartItem.objects.filter(cart=OuterRef("pk")).order_by().values("cart")
+    item_count = lines.annotate(total=Sum("quantity")).values("total")
+    subtotal = lines.annotate(
+        total=Sum(F("quantity") * F("product__price"), output_field=DecimalField())
+    ).values("total")
+
+    return Cart.objects.filter(pk__in=carts).update(
+        item_count=Coalesce(Subquery(item_count), Value(0)),
+        subtotal=Coalesce(
+            Subquery(subtotal), Value(Decimal("0")),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
+
+
+def add_to_cart(cart, lines):
+    """
+    Reserve stock for ``{product_id: quantity}`` and add it to ``cart`` in
+    one transaction. Raises InsufficientStock (listing every short line,
+    including unknown products) without touching the cart.
+    """
+    with transaction.atomic():
+        decrement_stock(lines)
+        quantities = upsert_cart_items(cart, lines)
+        refresh_cart_totals([cart.pk])
+    return quantities
+
+
+def checkout_cart(cart, user, product_ids=None):
+    """
+    Turn the items of ``cart`` into a pending Order and return it.
+
+    Pass ``product_ids`` to check out only those products. Cart lines
+    already hold the stock add_to_cart reserved for them, so checkout moves
+    that reservation into the order without touching stock again. The whole
+    checkout runs in a fixed number of queries regardless of cart size: the
+    cart lines are read once with their products (and locked against a
+    concurrent checkout of the same cart), order items are bulk inserted and
+    the checked-out lines are removed with one DELETE before the cart totals
+    are refreshed.
+
+    Raises EmptyCart if nothing matches, in which case nothing is written.
+    """
+    with transaction.atomic():
+        cart_items = CartItem.objects.select_related("product").select_for_update(
+            of=("self",)
+        ).filter(cart=cart)
+        if product_ids is not None:
+            cart_items = cart_items.filter(product_id__in=product_ids)
+
+        cart_items = list(cart_items)
+        if not cart_items:
+            raise EmptyCart()
+
+        order = Order.objects.create(
+            user=user,
+            total_amount=sum(item.product.price * item.quantity for item in cart_items),
+            status=STATUSCHOICES.PENDING,
+            created_by=user.email,
+            updated_by=user.email
+        )
+
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=item.product,
+                quantity=item.quantity,
+                price_at_order_time=item.product.price,
+                created_by=user.email,
+                updated_by=user.email
+            )
+            for item in cart_items
+        ])
+
+        CartItem.objects.filter(pk__in=[item.pk for item in cart_items]).delete()
+        refresh_cart_totals([cart.pk])
+
+    return order
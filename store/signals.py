@@ -0,0 +1,108 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from store.cache import catalog_cache, product_cache, product_slug_cache, user_flags_cache
+from store.models import Cart, Category, Product, User
+from store.search import product_search_index
+from store.services import refresh_cart_totals, refresh_category_counts
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product(sender, instance, **kwargs):
+    product_cache.invalidate([instance.pk])
+    catalog_cache.invalidate(["products"])
+
+
+@receiver(post_save, sender=Product)
+def refresh_carts_with_product(sender, instance, created, **kwargs):
+    # Cart subtotals follow the current price
+    if not created:
+        refresh_cart_totals(Cart.objects.filter(store_cartitem_cart__product=instance).values("pk"))
+
+
+@receiver(pre_delete, sender=Product)
+def remember_carts_with_product(sender, instance, **kwargs):
+    # The cart items are gone by post_delete; note whose totals to refresh
+    instance._cart_ids = list(
+        Cart.objects.filter(store_cartitem_cart__product=instance).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Product)
+def refresh_carts_without_product(sender, instance, **kwargs):
+    cart_ids = getattr(instance, "_cart_ids", None)
+    if cart_ids:
+        refresh_cart_totals(cart_ids)
+
+
+@receiver(pre_save, sender=Product)
+def remember_product_state(sender, instance, raw=False, **kwargs):
+    # A product moved to another category changes the counts of both, and
+    # a changed slug leaves a stale entry under the old one
+    instance._previous_category_id = instance._previous_slug = None
+    if instance.pk and not raw:
+        previous = Product.objects.filter(pk=instance.pk).values_list("category_id", "slug").first()
+        if previous:
+            instance._previous_category_id, instance._previous_slug = previous
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_slug(sender, instance, **kwargs):
+    slugs = {instance.slug, getattr(instance, "_previous_slug", None)}
+    product_slug_cache.invalidate([slug for slug in slugs if slug])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def refresh_product_category_counts(sender, instance, **kwargs):
+    category_ids = {instance.category_id, getattr(instance, "_previous_category_id", None)}
+    refresh_category_counts([pk for pk in category_ids if pk is not None])
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    product_id, name, description = instance.pk, instance.name, instance.description
+    transaction.on_commit(
+        lambda: product_search_index.update(product_id, name, description)
+    )
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    product_id = instance.pk
+    transaction.on_commit(
+        lambda: product_search_index.update(product_id, deleted=True)
+    )
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_name(sender, instance, raw=False, **kwargs):
+    instance._previous_name = None
+    if instance.pk and not raw:
+        instance._previous_name = Category.objects.filter(pk=instance.pk).values_list("name", flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def invalidate_category_products(sender, instance, created, **kwargs):
+    # Cached product details embed the category name; nothing else of the
+    # category is in them
+    previous_name = getattr(instance, "_previous_name", None)
+    if not created and previous_name is not None and previous_name != instance.name:
+        product_cache.invalidate(
+            Product.objects.filter(category=instance).values_list("id", flat=True)
+        )
+    catalog_cache.invalidate(["products", "categories"])
+
+
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, instance, **kwargs):
+    catalog_cache.invalidate(["categories"])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_flags(sender, instance, **kwargs):
+    user_flags_cache.invalidate([instance.pk])
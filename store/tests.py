@@ -1,3 +1,993 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.db import connection
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from libs.renderers import FastJSONRenderer, RawJSON
+
+from store.async_views import (
+    AsyncCategoryListAPIView,
+    AsyncProductDetailAPIView,
+    AsyncProductListAPIView,
+    AsyncViewCartAPIView,
+)
+from store.authentication import StoreRefreshToken, load_user_flags
+from store.benchmarks import run_benchmarks, run_serializer_benchmark, seed_dataset
+from store.cache import catalog_cache, product_cache
+from store.categories import category_listing
+from store.exporters import EXPORT_COLUMNS
+from store.hashers import StoreArgon2PasswordHasher, StoreBCryptSHA256PasswordHasher
+from store.importers import import_products
+from store.models import Cart, CartItem, Category, Order, OrderItem, Product, RevokedToken, User
+from store.passwords import PasswordHasherPool, password_hasher
+from store.revocation import TokenDenylist, token_denylist
+from store.routers import start_replica_reads, stop_replica_reads
+from store.search import ProductSearchIndex, product_search_index
+from store.serializers import OrderSerializer, fast_order
+from store.services import InsufficientStock, decrement_stock, upsert_cart_items
+from store.timeouts import apply_statement_timeout, set_statement_timeout
+from store.views import ProductDetailAPIView, load_product_id
+
+
+class StoreBenchmarkTests(TestCase):
+    """
+    Small-scale run of the benchmark suite. Each scenario has a query budget
+    that holds regardless of how many products, cart lines or orders exist,
+    so an N+1 regression fails here before it shows up in latency numbers.
+    Use ``manage.py benchmark_store`` for timings against a stored baseline.
+    """
+    QUERY_BUDGETS = {
+        "product-list": 1,
+        "product-detail": 1,
+        "category-list": 1,
+        "add-to-cart": 10,
+        "view-cart": 2,
+        "cart-summary": 1,
+        "checkout": 10,
+        "order-history": 2,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_dataset(categories=3, products=200, users=2, cart_items=20, orders=20)
+
+    def test_query_budgets(self):
+        results = run_benchmarks(self.users, iterations=3)
+
+        for name, budget in self.QUERY_BUDGETS.items():
+            with self.subTest(scenario=name):
+                self.assertLessEqual(results[name]["queries"], budget)
+
+    def test_results_report_latency_percentiles(self):
+        results = run_benchmarks(self.users, iterations=5, scenarios=["product-list"])
+
+        result = results["product-list"]
+        self.assertEqual(result["iterations"], 5)
+        self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+        self.assertGreater(result["rps"], 0)
+
+    def test_compiled_serializers_match_drf(self):
+        Product.objects.filter(pk=Product.objects.order_by("id")[0].pk).update(
+            image="product_images/sample.png", description=None
+        )
+
+        for name, result in run_serializer_benchmark(iterations=1).items():
+            with self.subTest(case=name):
+                self.assertTrue(result["identical"])
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    data = {
+        "price": Decimal("19.90"),
+        "created_at": datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=timezone.utc),
+        "name": "Caf\u00e9 \u2028 chair",
+        "tags": ("a", "b"),
+        "stock": None,
+    }
+
+    def test_matches_drf_renderer(self):
+        for media_type in ("application/json", "application/json; indent=2"):
+            with self.subTest(media_type=media_type):
+                self.assertEqual(
+                    FastJSONRenderer().render(self.data, media_type),
+                    JSONRenderer().render(self.data, media_type),
+                )
+
+    def test_raw_json_is_embedded_as_is(self):
+        product = JSONRenderer().render(self.data)
+
+        rendered = FastJSONRenderer().render({"data": {"product": RawJSON(product)}, "success": True})
+
+        self.assertEqual(rendered, b'{"data":{"product":' + product + b'},"success":true}')
+
+
+class StreamingResponseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_dataset(categories=2, products=30, users=1, cart_items=1, orders=12)[0]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {StoreRefreshToken.for_user(self.user).access_token}")
+
+    def paged(self, url, key):
+        items, params = [], {"page_size": 5}
+        while True:
+            data = self.client.get(url, params).json()["data"]
+            items += data[key]
+            if not data["has_more"]:
+                return items
+            params["cursor"] = data["next_cursor"]
+
+    def test_stream_matches_pages(self):
+        for url, key in (("/api/store/product-list/", "products"), ("/api/store/orders/history/", "orders")):
+            with self.subTest(url=url):
+                response = self.client.get(url, {"stream": "1"})
+
+                body = json.loads(b"".join(response.streaming_content))
+                self.assertEqual(body["data"], {key: self.paged(url, key), "next_cursor": None, "has_more": False})
+
+    def test_stream_is_compressed_when_accepted(self):
+        response = self.client.get("/api/store/product-list/", {"stream": "1"}, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        body = json.loads(gzip.decompress(b"".join(response.streaming_content)))
+        self.assertEqual(len(body["data"]["products"]), 30)
+
+
+class StockReservationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="shopper@example.com", name="Shopper", password="password")
+        self.product = Product.objects.create(
+            name="Lamp", price=Decimal("10.00"), stock=5, category=Category.objects.create(name="Lighting")
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def stock(self):
+        self.product.refresh_from_db()
+        return self.product.stock
+
+    def add(self, quantity):
+        return self.client.post(f"/api/store/cart/add/{self.product.pk}/", {"quantity": quantity}, format="json")
+
+    def test_cart_reserves_and_checkout_keeps_the_reservation(self):
+        self.add(2)
+        self.assertEqual(self.stock(), 3)
+
+        self.client.delete(f"/api/store/cart/remove/{self.product.pk}/")
+        self.assertEqual(self.stock(), 5)
+
+        self.add(5)
+        self.assertEqual(self.stock(), 0)
+        response = self.client.post("/api/store/order/place/")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.stock(), 0)
+        self.assertEqual(OrderItem.objects.get(order__user=self.user).quantity, 5)
+
+    def test_short_lines_take_no_stock_and_are_all_reported(self):
+        shade = Product.objects.create(name="Shade", price=Decimal("5.00"), stock=1, category=self.product.category)
+
+        with self.assertRaises(InsufficientStock) as raised:
+            decrement_stock({self.product.pk: 2, shade.pk: 3})
+
+        self.assertEqual(
+            raised.exception.shortfalls,
+            [{"product_id": shade.pk, "product_name": "Shade", "requested": 3, "available": 1}],
+        )
+        self.assertEqual(self.stock(), 5)
+        shade.refresh_from_db()
+        self.assertEqual(shade.stock, 1)
+
+    def test_shortfall_response_lists_every_short_line(self):
+        response = self.client.post(
+            "/api/store/cart/add/",
+            {"items": [{"product_id": self.product.pk, "quantity": 6}, {"product_id": 999999, "quantity": 1}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["errors"]
+        self.assertEqual(errors["code"], "insufficient_stock")
+        self.assertEqual(
+            errors["errors"],
+            [
+                {"product_id": self.product.pk, "product_name": "Lamp", "requested": 6, "available": 5},
+                {"product_id": 999999, "product_name": None, "requested": 1, "available": 0},
+            ],
+        )
+        self.assertEqual(self.stock(), 5)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_adding_a_product_again_merges_into_its_line(self):
+        self.add(1)
+        response = self.client.post(
+            "/api/store/cart/add/",
+            {"items": [{"product_id": self.product.pk, "quantity": 1}, {"product_id": self.product.pk, "quantity": 2}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["data"]["cart_items"], [
+            {"product_id": self.product.pk, "product_name": "Lamp", "quantity": 4},
+        ])
+        self.assertEqual(CartItem.objects.get().quantity, 4)
+        self.assertEqual(self.stock(), 1)
+
+    def test_upsert_fallback_merges_the_same_way(self):
+        cart = Cart.objects.create(user=self.user)
+        features = connection.features
+
+        with mock.patch.object(features, "supports_update_conflicts_with_target", False):
+            self.assertEqual(upsert_cart_items(cart, {self.product.pk: 2}), {self.product.pk: 2})
+            self.assertEqual(upsert_cart_items(cart, {self.product.pk: 3}), {self.product.pk: 5})
+
+        self.assertEqual(CartItem.objects.get().quantity, 5)
+
+
+class TokenAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="member@example.com", name="Member", password="password")
+        self.client = APIClient()
+
+    def get_cart(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return self.client.get("/api/store/cart/")
+
+    def deactivate(self):
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+    def test_token_of_inactive_user_is_rejected(self):
+        self.deactivate()
+
+        response = self.get_cart(StoreRefreshToken.for_user(self.user).access_token)
+
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(STORE_USER_FLAGS_CACHE_TIMEOUT=60)
+    def test_deactivation_applies_to_issued_tokens_with_flags_cache(self):
+        token = StoreRefreshToken.for_user(self.user).access_token
+        self.assertNotEqual(self.get_cart(token).status_code, 401)
+
+        self.deactivate()
+
+        self.assertEqual(self.get_cart(token).status_code, 401)
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="member@example.com", name="Member", password="password")
+        self.refresh = StoreRefreshToken.for_user(self.user)
+        self.client = APIClient()
+
+    def post(self, url, data, token=None):
+        self.client.credentials(**({"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}))
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, data, format="json")
+
+    def revoke(self, denylist, token):
+        with self.captureOnCommitCallbacks(execute=True):
+            return denylist.revoke(token)
+
+    def test_logout_revokes_access_and_refresh_token(self):
+        access = self.refresh.access_token
+        self.post("/api/store/logout/", {"refresh": str(self.refresh)}, token=access)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(self.client.get("/api/store/cart/").status_code, 401)
+        self.assertEqual(self.post("/api/store/token/refresh/", {"refresh": str(self.refresh)}).status_code, 401)
+
+    def test_refresh_token_works_once(self):
+        first = self.post("/api/store/token/refresh/", {"refresh": str(self.refresh)})
+        replay = self.post("/api/store/token/refresh/", {"refresh": str(self.refresh)})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(replay.status_code, 401)
+
+    def test_other_processes_load_only_new_revocations(self):
+        other = TokenDenylist()
+        other.is_revoked("warm-up")
+
+        self.revoke(token_denylist, self.refresh)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(other.is_revoked(self.refresh["jti"]))
+        with self.assertNumQueries(0):
+            self.assertFalse(other.is_revoked(StoreRefreshToken.for_user(self.user)["jti"]))
+
+    def test_purge_and_rebuild_keep_unexpired_revocations(self):
+        expired = RevokedToken.objects.create(jti="expired", expires_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+        self.revoke(token_denylist, self.refresh)
+
+        self.assertEqual(token_denylist.purge_expired(), 1)
+        self.assertFalse(RevokedToken.objects.filter(pk=expired.pk).exists())
+
+        rebuilt = TokenDenylist()
+        rebuilt.rebuild(version=None)
+        self.assertTrue(rebuilt.is_revoked(self.refresh["jti"]))
+        self.assertFalse(rebuilt.is_revoked("expired"))
+
+
+@override_settings(STORE_READ_REPLICAS=["replica"])
+class ReplicaRoutingTests(TestCase):
+    """
+    Cache fills inside replica-routed views must read the primary. The
+    "replica" alias isn't configured, so a fill routed to it would fail.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(email="member@example.com", name="Member", password="password")
+        self.product = Product.objects.create(
+            name="Lamp", price=Decimal("10.00"), stock=5, category=Category.objects.create(name="Lighting")
+        )
+        start_replica_reads(RequestFactory().get("/"))
+        self.addCleanup(stop_replica_reads)
+
+    def test_cache_fills_read_the_primary(self):
+        self.assertEqual(Product.objects.db, "replica")
+
+        self.assertEqual(json.loads(ProductDetailAPIView.load_product(self.product.pk))["name"], "Lamp")
+        self.assertEqual(load_product_id(self.product.slug), self.product.pk)
+        self.assertTrue(load_user_flags(self.user.pk)["is_active"])
+
+
+class ProductListValidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Lighting")
+        for price in ("5.00", "10.00", "15.00", "20.00"):
+            Product.objects.create(name=f"Lamp {price}", price=Decimal(price), stock=1, category=category)
+
+    def get(self, **params):
+        return self.client.get("/api/store/product-list/", params)
+
+    def assertInvalid(self, response, field):
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(field, response.json()["errors"]["errors"])
+
+    def test_price_filters_reject_non_finite_and_malformed_numbers(self):
+        for value in ("NaN", "Infinity", "-inf", "abc"):
+            with self.subTest(value=value):
+                self.assertInvalid(self.get(min_price=value), "min_price")
+                self.assertInvalid(self.get(max_price=value), "max_price")
+
+    def test_price_range_and_sort(self):
+        products = self.get(min_price="10", max_price="15", sort="-price").json()["data"]["products"]
+
+        self.assertEqual([product["price"] for product in products], ["15.00", "10.00"])
+        self.assertInvalid(self.get(sort="stock"), "sort")
+
+    def test_cursor_pages_and_rejects_tampered_cursors(self):
+        first = self.get(sort="price", page_size=3).json()["data"]
+        second = self.get(sort="price", page_size=3, cursor=first["next_cursor"]).json()["data"]
+
+        self.assertEqual([product["price"] for product in second["products"]], ["20.00"])
+        self.assertFalse(second["has_more"])
+        for cursor in ("not-a-cursor", "WyJOYU4iLDFd"):  # the second is ["NaN",1]
+            with self.subTest(cursor=cursor):
+                self.assertInvalid(self.get(sort="price", cursor=cursor), "cursor")
+
+
+class ProductSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Lighting")
+        for name, description in (
+            ("Desk Lamp", "Warm light for reading"),
+            ("Floor Lamp", "Tall and bright"),
+            ("Reading Chair", "Pairs well with a lamp"),
+        ):
+            Product.objects.create(name=name, description=description, price=Decimal("10.00"), stock=1, category=cls.category)
+
+    def setUp(self):
+        product_search_index.build()
+
+    def search(self, query):
+        response = self.client.get("/api/store/products/search/", {"q": query})
+        return [product["name"] for product in response.json()["data"]["products"]]
+
+    def test_all_terms_match_and_the_last_is_a_prefix(self):
+        self.assertEqual(self.search("lam")[2], "Reading Chair")
+        self.assertEqual(set(self.search("lam")[:2]), {"Desk Lamp", "Floor Lamp"})
+        self.assertEqual(self.search("reading lam"), ["Reading Chair", "Desk Lamp"])
+        self.assertEqual(self.search("desk sofa"), [])
+
+    def test_local_writes_are_applied_incrementally(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(name="Table Lamp", price=Decimal("10.00"), stock=1, category=self.category)
+
+        self.assertEqual(product_search_index.version, catalog_cache.get_version("search"))
+        self.assertEqual(self.search("table"), ["Table Lamp"])
+
+    def test_index_is_stale_after_another_process_writes(self):
+        catalog_cache.bump(["search"])
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(name="Table Lamp", price=Decimal("10.00"), stock=1, category=self.category)
+
+        self.assertNotEqual(product_search_index.version, catalog_cache.get_version("search"))
+
+    def test_stale_index_keeps_answering_while_it_rebuilds(self):
+        catalog_cache.bump(["search"])
+
+        with mock.patch.object(ProductSearchIndex, "rebuild_in_background") as rebuild:
+            self.assertEqual(self.search("floor"), ["Floor Lamp"])
+
+        rebuild.assert_called_once()
+
+
+class ProductImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.create(name="Chairs")
+
+    def row(self, sku, price="10.00", stock=1):
+        return {"sku": sku, "name": f"Chair {sku}", "price": price, "stock": stock, "category": "chairs"}
+
+    def test_out_of_range_rows_are_skipped_and_reported(self):
+        rows = enumerate(
+            [
+                self.row("ok"),
+                self.row("big-price", price="100000000"),
+                self.row("rounds-up", price="99999999.999"),
+                self.row("huge-price", price="1E+40"),
+                self.row("big-stock", stock=2**63),
+                self.row("max-price", price="99999999.99"),
+            ],
+            start=2,
+        )
+
+        result = import_products(rows)
+
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(result.skipped, 4)
+        self.assertEqual(
+            [error.split(":")[0] for error in result.errors], ["line 3", "line 4", "line 5", "line 6"]
+        )
+        self.assertEqual(
+            set(Product.objects.values_list("sku", flat=True)), {"ok", "max-price"}
+        )
+
+
+class CategoryInvalidationTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@example.com", name="Admin", password="password")
+        self.category = Category.objects.create(name="Lighting")
+        self.product = Product.objects.create(name="Lamp", price=Decimal("10.00"), stock=1, category=self.category)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def update(self, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(f"/api/store/admin/category/update/{self.category.pk}/", data, format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def test_products_keep_their_cache_unless_the_name_changes(self):
+        version = product_cache.get_version(self.product.pk)
+
+        self.update(name="Lighting")
+        self.assertEqual(product_cache.get_version(self.product.pk), version)
+
+        self.update(name="Lamps")
+        self.assertNotEqual(product_cache.get_version(self.product.pk), version)
+        response = self.client.get(f"/api/store/product/{self.product.slug}/")
+        self.assertEqual(response.json()["data"]["product"]["category"], "Lamps")
+
+    def test_update_records_the_editor_in_one_save(self):
+        self.update(name="Lamps")
+
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.updated_by, "admin@example.com")
+
+
+class StatementTimeoutTests(TestCase):
+    class RawConnection:
+        def __init__(self):
+            self.statements = []
+
+        def cursor(self):
+            cursor = mock.MagicMock()
+            cursor.__enter__.return_value.execute = self.statements.append
+            return cursor
+
+    def setUp(self):
+        self.connection = mock.Mock(connection=self.RawConnection(), needs_rollback=False, in_atomic_block=False)
+        self.addCleanup(set_statement_timeout, None)
+
+    def query(self, timeout):
+        set_statement_timeout(timeout)
+        execute = mock.Mock()
+        apply_statement_timeout(execute, "SELECT 1", None, False, {"connection": self.connection})
+        execute.assert_called_once()
+
+    def test_timeout_is_only_set_when_it_changes(self):
+        for timeout in (None, 2000, 2000, 1000, None, None):
+            self.query(timeout)
+
+        self.assertEqual(
+            self.connection.connection.statements,
+            ["SET statement_timeout = 2000", "SET statement_timeout = 1000", "SET statement_timeout TO DEFAULT"],
+        )
+
+    def test_timeout_set_in_a_transaction_is_set_again_after_it(self):
+        self.connection.in_atomic_block = True
+        self.query(2000)
+        self.connection.in_atomic_block = False
+        self.query(2000)
+        self.query(2000)
+
+        self.assertEqual(self.connection.connection.statements, ["SET statement_timeout = 2000"] * 2)
+
+    def test_middleware_sets_the_endpoint_timeout_and_leaves_it_for_the_body(self):
+        client = APIClient()
+        with mock.patch("store.middlewares.set_statement_timeout") as set_timeout:
+            client.get("/api/store/product-list/")
+
+        self.assertEqual(set_timeout.call_args_list, [mock.call(None), mock.call(2000)])
+
+
+@override_settings(STORE_METRICS_TOKEN="scrape-secret")
+class MetricsEndpointTests(TestCase):
+    def test_metrics_require_the_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 401)
+
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"store_requests_total", response.content)
+
+    @override_settings(STORE_METRICS_TOKEN="")
+    def test_metrics_are_not_served_without_a_token(self):
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer ").status_code, 404)
+
+
+class SlugTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Chairs")
+
+    def create(self, name):
+        return Product.objects.create(name=name, price=Decimal("10.00"), stock=1, category=self.category)
+
+    def test_colliding_names_get_numbered_slugs(self):
+        slugs = [self.create("Red Chair").slug for _ in range(3)]
+
+        self.assertEqual(slugs, ["red-chair", "red-chair-2", "red-chair-3"])
+        response = self.client.get("/api/store/product/red-chair-2/")
+        self.assertEqual(response.json()["data"]["product"]["slug"], "red-chair-2")
+
+    def test_slug_survives_a_rename(self):
+        product = self.create("Red Chair")
+        product.name = "Blue Chair"
+        product.save()
+
+        product.refresh_from_db()
+        self.assertEqual(product.slug, "red-chair")
+
+    def test_long_names_keep_room_for_the_suffix(self):
+        max_length = Product._meta.get_field("slug").max_length
+        first, second = self.create("chair " * 100), self.create("chair " * 100)
+
+        self.assertLessEqual(len(first.slug), max_length)
+        self.assertLessEqual(len(second.slug), max_length)
+        self.assertTrue(second.slug.endswith("-2"))
+
+    def test_imported_products_avoid_existing_and_each_others_slugs(self):
+        self.create("Red Chair")
+        rows = [
+            (line, {"sku": f"sku-{line}", "name": "Red Chair", "price": "10.00", "stock": 1, "category": "chairs"})
+            for line in (2, 3)
+        ]
+
+        import_products(rows)
+
+        self.assertEqual(
+            dict(Product.objects.filter(sku__startswith="sku-").values_list("sku", "slug")),
+            {"sku-2": "red-chair-2", "sku-3": "red-chair-3"},
+        )
+
+
+class OrderExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email="admin@example.com", name="Admin", password="password")
+        cls.customer = User.objects.create_user(email="customer@example.com", name="Customer", password="password")
+        product = Product.objects.create(
+            name="Lamp", sku="LAMP-1", price=Decimal("10.00"), stock=10, category=Category.objects.create(name="Lighting")
+        )
+        for day, status in ((9, "completed"), (10, "pending"), (11, "cancelled"), (12, "completed")):
+            order = Order.objects.create(user=cls.customer, total_amount=Decimal("20.00"), status=status)
+            Order.objects.filter(pk=order.pk).update(ordered_at=datetime(2026, 1, day, 23, 30, tzinfo=timezone.utc))
+            OrderItem.objects.create(order=order, product=product, quantity=2, price_at_order_time=Decimal("10.00"))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def export(self, **params):
+        response = self.client.get("/api/store/admin/orders/export/", params)
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    def test_filters_by_inclusive_dates_and_status(self):
+        rows = self.export(output="jsonl", **{"from": "2026-01-10", "to": "2026-01-12"})
+        self.assertEqual([row["status"] for row in rows], ["pending", "cancelled", "completed"])
+
+        rows = self.export(output="jsonl", status="completed,cancelled", to="2026-01-11")
+        self.assertEqual([row["ordered_at"][:10] for row in rows], ["2026-01-09", "2026-01-11"])
+        self.assertEqual(rows[0]["sku"], "LAMP-1")
+        self.assertEqual(rows[0]["line_total"], "20.00")
+
+    def test_csv_has_a_header_row(self):
+        response = self.client.get("/api/store/admin/orders/export/", {"status": "pending"})
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(lines[0].split(","), EXPORT_COLUMNS)
+        self.assertEqual(len(lines), 2)
+
+    def test_csv_cells_cannot_start_a_formula(self):
+        Product.objects.update(name='=HYPERLINK("http://example.com","Lamp")')
+        User.objects.filter(pk=self.customer.pk).update(email="@sum(1)@example.com")
+
+        response = self.client.get("/api/store/admin/orders/export/", {"status": "pending"})
+        row = next(csv.reader(b"".join(response.streaming_content).decode().splitlines()[1:]))
+        self.assertEqual(row[EXPORT_COLUMNS.index("product_name")], '\'=HYPERLINK("http://example.com","Lamp")')
+        self.assertEqual(row[EXPORT_COLUMNS.index("customer_email")], "'@sum(1)@example.com")
+
+        rows = self.export(output="jsonl", status="pending")
+        self.assertEqual(rows[0]["product_name"], '=HYPERLINK("http://example.com","Lamp")')
+
+    def test_bad_filters_are_rejected(self):
+        for params in ({"from": "2026-13-01"}, {"from": "2026-01-12", "to": "2026-01-10"},
+                       {"status": "shipped"}, {"output": "xml"}):
+            response = self.client.get("/api/store/admin/orders/export/", params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_only_admins_can_export(self):
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get("/api/store/admin/orders/export/").status_code, 403)
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get("/api/store/admin/orders/export/").status_code, 401)
+
+
+class FastSerializerTests(TestCase):
+    def test_order_with_a_deleted_product_matches_drf(self):
+        user = User.objects.create_user(email="shopper@example.com", name="Shopper", password="password")
+        category = Category.objects.create(name="Lighting")
+        kept, deleted = (
+            Product.objects.create(name=name, price=Decimal("10.00"), stock=5, category=category)
+            for name in ("Lamp", "Shade")
+        )
+        order = Order.objects.create(user=user, total_amount=Decimal("20.00"))
+        for product in (kept, deleted):
+            OrderItem.objects.create(order=order, product=product, quantity=1, price_at_order_time=Decimal("10.00"))
+        deleted.delete()
+
+        orders = Order.objects.filter(pk=order.pk)
+        drf = OrderSerializer(orders, many=True).data
+        fast = fast_order.serialize(fast_order.values(orders))
+
+        self.assertNotIn("product_name", drf[0]["items"][1])
+        self.assertEqual(JSONRenderer().render(fast), JSONRenderer().render(drf))
+
+
+class ConditionalRequestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="shopper@example.com", name="Shopper", password="password")
+        cls.product = Product.objects.create(
+            name="Lamp", price=Decimal("10.00"), stock=5, category=Category.objects.create(name="Lighting")
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_matching_etag_gets_a_304(self):
+        for url in ("/api/store/product-list/", f"/api/store/{self.product.pk}/", "/api/store/admin/category/list/"):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            etag = response["ETag"]
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304, url)
+            self.assertEqual(response["ETag"], etag)
+            self.assertEqual(response.content, b"")
+
+    def test_etag_changes_when_a_product_is_saved(self):
+        urls = ("/api/store/product-list/", f"/api/store/{self.product.pk}/")
+        etags = [self.client.get(url)["ETag"] for url in urls]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.price = Decimal("12.00")
+            self.product.save()
+
+        for url, etag in zip(urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertNotEqual(response["ETag"], etag)
+
+    def test_missing_product_has_no_etag(self):
+        for url in ("/api/store/999999/", "/api/store/product/no-such-product/"):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 404, url)
+            self.assertFalse(response.has_header("ETag"), url)
+
+    def test_cache_control_follows_the_view_policy(self):
+        for url, policy in (
+            ("/api/store/product-list/", "public, no-cache"),
+            (f"/api/store/{self.product.pk}/", "public, no-cache"),
+            (f"/api/store/product/{self.product.slug}/", "public, no-cache"),
+            ("/api/store/admin/category/list/", "private, no-cache"),
+            ("/api/store/cart/", "private, no-store, no-cache, must-revalidate, max-age=0"),
+        ):
+            self.assertEqual(self.client.get(url)["Cache-Control"], policy, url)
+
+        response = self.client.get("/api/store/cart/")
+        self.assertEqual(response["Pragma"], "no-cache")
+        self.assertEqual(response["Expires"], "0")
+
+
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_dataset(categories=2, products=12, users=1, cart_items=2, orders=0)[0]
+        cls.product = Product.objects.order_by("id").first()
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.headers = {"Authorization": f"Bearer {StoreRefreshToken.for_user(self.user).access_token}"}
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.headers["Authorization"])
+
+    async def call(self, view, url, headers=None, **kwargs):
+        request = self.factory.get(url, headers={**self.headers, **(headers or {})})
+        return await view.as_view()(request, **kwargs)
+
+    async def sync_data(self, url):
+        response = await sync_to_async(self.client.get)(url)
+        return json.loads(response.content)["data"]
+
+    async def test_product_list_matches_the_sync_view(self):
+        response = await self.call(AsyncProductListAPIView, "/api/store/product-list/?page_size=5")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            json.loads(response.content)["data"], await self.sync_data("/api/store/product-list/?page_size=5")
+        )
+
+    async def test_product_list_streams_every_product(self):
+        response = await self.call(AsyncProductListAPIView, "/api/store/product-list/?stream=1")
+
+        body = json.loads(b"".join([chunk async for chunk in response.streaming_content]))
+        self.assertEqual(len(body["data"]["products"]), 12)
+        self.assertIs(body["data"]["has_more"], False)
+
+    async def test_product_detail(self):
+        url = f"/api/store/{self.product.pk}/"
+        response = await self.call(AsyncProductDetailAPIView, url, pk=self.product.pk)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["data"], await self.sync_data(url))
+
+        response = await self.call(
+            AsyncProductDetailAPIView, url, headers={"If-None-Match": response["ETag"]}, pk=self.product.pk
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = await self.call(AsyncProductDetailAPIView, "/api/store/999999/", pk=999999)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header("ETag"))
+
+    async def test_cart_and_category_list_match_the_sync_views(self):
+        for view, url in (
+            (AsyncViewCartAPIView, "/api/store/cart/"),
+            (AsyncCategoryListAPIView, "/api/store/admin/category/list/"),
+        ):
+            response = await self.call(view, url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(json.loads(response.content)["data"], await self.sync_data(url))
+
+    async def test_cart_requires_authentication(self):
+        self.headers = {}
+        response = await self.call(AsyncViewCartAPIView, "/api/store/cart/")
+
+        self.assertEqual(response.status_code, 401)
+        self.assertTrue(response.has_header("WWW-Authenticate"))
+
+
+class PasswordHashingTests(TestCase):
+    @override_settings(
+        STORE_ARGON2_TIME_COST=3, STORE_ARGON2_MEMORY_COST=1024, STORE_ARGON2_PARALLELISM=2, STORE_BCRYPT_ROUNDS=5
+    )
+    def test_hasher_costs_follow_settings(self):
+        argon2 = StoreArgon2PasswordHasher()
+        self.assertEqual((argon2.time_cost, argon2.memory_cost, argon2.parallelism), (3, 1024, 2))
+        self.assertEqual(StoreBCryptSHA256PasswordHasher().rounds, 5)
+
+    def test_login_with_an_outdated_hash_is_rehashed(self):
+        hasher = PBKDF2PasswordHasher()
+        user = User.objects.create_user(
+            email="member@example.com", name="Member",
+            encoded_password=hasher.encode("password", hasher.salt(), iterations=1000),
+        )
+
+        response = self.client.post("/api/store/login/", {"email": user.email, "password": "password"})
+
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertEqual(hasher.decode(user.password)["iterations"], hasher.iterations)
+        self.assertTrue(user.check_password("password"))
+
+    @override_settings(STORE_PASSWORD_HASH_WORKERS=1)
+    def test_saturated_pool_answers_503(self):
+        User.objects.create_user(email="member@example.com", name="Member", password="password")
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+
+        with mock.patch.object(password_hasher, "_get_executor"), mock.patch.object(password_hasher, "_slots", slots):
+            responses = [
+                self.client.post("/api/store/login/", {"email": "member@example.com", "password": "password"}),
+                self.client.post(
+                    "/api/store/register/", {"email": "new@example.com", "name": "New", "password": "password"}
+                ),
+            ]
+
+        for response in responses:
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response["Retry-After"], "1")
+            self.assertEqual(response.json()["errors"]["code"], "hashing_busy")
+        self.assertFalse(User.objects.filter(email="new@example.com").exists())
+
+    @override_settings(STORE_PASSWORD_HASH_WORKERS=1, STORE_PASSWORD_HASH_MAX_PENDING=1)
+    def test_pool_hashes_in_a_worker_process_and_frees_its_slot(self):
+        pool = PasswordHasherPool()
+        self.addCleanup(pool.shutdown)
+
+        encoded = pool.make_password("password")
+        self.assertEqual(pool.check_password("password", encoded), (True, None))
+        self.assertEqual(pool.check_password("wrong", encoded), (False, None))
+        # The slot is released by a done callback, possibly just after result() returns
+        self.assertTrue(pool._slots.acquire(timeout=5))
+
+
+class CategoryCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="shopper@example.com", name="Shopper", password="password")
+        self.lighting = Category.objects.create(name="Lighting")
+        self.seating = Category.objects.create(name="Seating")
+        self.lamp = self.create("LAMP", "Lamp", 2, self.lighting)
+        self.shade = self.create("SHADE", "Shade", 1, self.lighting)
+        self.bulb = self.create("BULB", "Bulb", 0, self.lighting)
+        self.chair = self.create("CHAIR", "Chair", 3, self.seating)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create(self, sku, name, stock, category):
+        return Product.objects.create(sku=sku, name=name, price=Decimal("10.00"), stock=stock, category=category)
+
+    def counts(self):
+        return {
+            name: (product_count, in_stock_count)
+            for name, product_count, in_stock_count in Category.objects.order_by("id").values_list(
+                "name", "product_count", "in_stock_count"
+            )
+        }
+
+    def test_counts_follow_stock_crossing_zero_in_the_cart(self):
+        self.assertEqual(self.counts(), {"Lighting": (3, 2), "Seating": (1, 1)})
+
+        # Both lines sell out in one UPDATE
+        self.client.post(
+            "/api/store/cart/add/",
+            {"items": [{"product_id": self.lamp.pk, "quantity": 2}, {"product_id": self.shade.pk, "quantity": 1}]},
+            format="json",
+        )
+        self.assertEqual(self.counts(), {"Lighting": (3, 0), "Seating": (1, 1)})
+
+        self.client.post(f"/api/store/cart/add/{self.chair.pk}/", {"quantity": 1}, format="json")
+        self.assertEqual(self.counts(), {"Lighting": (3, 0), "Seating": (1, 1)})
+
+        self.client.delete(f"/api/store/cart/remove/{self.lamp.pk}/")
+        self.assertEqual(self.counts(), {"Lighting": (3, 1), "Seating": (1, 1)})
+        self.client.delete(f"/api/store/cart/remove/{self.shade.pk}/")
+        self.assertEqual(self.counts(), {"Lighting": (3, 2), "Seating": (1, 1)})
+
+    def test_counts_follow_moves_deletes_and_imports(self):
+        self.lamp.category = self.seating
+        self.lamp.save()
+        self.assertEqual(self.counts(), {"Lighting": (2, 1), "Seating": (2, 2)})
+
+        self.shade.delete()
+        self.assertEqual(self.counts(), {"Lighting": (1, 0), "Seating": (2, 2)})
+
+        rows = [
+            {"sku": "CHAIR", "name": "Chair", "price": "10.00", "stock": 3, "category": "lighting"},
+            {"sku": "STOOL", "name": "Stool", "price": "10.00", "stock": 0, "category": "seating"},
+            {"sku": "DESK", "name": "Desk", "price": "10.00", "stock": 4, "category": "seating"},
+        ]
+        import_products(enumerate(rows, start=2))
+        self.assertEqual(self.counts(), {"Lighting": (2, 1), "Seating": (3, 2)})
+
+    def test_listing_reloads_after_the_categories_version_changes(self):
+        # setUp's on_commit bumps never ran; drop whatever another test loaded
+        catalog_cache.bump(["categories"])
+        category_listing.all()
+        with self.assertNumQueries(0):
+            self.assertEqual(category_listing.all()[0]["in_stock_count"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/api/store/cart/add/{self.lamp.pk}/", {"quantity": 2}, format="json")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(category_listing.all()[0]["in_stock_count"], 1)
+
+
+class CartTotalsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="shopper@example.com", name="Shopper", password="password")
+        category = Category.objects.create(name="Lighting")
+        self.lamp = Product.objects.create(name="Lamp", price=Decimal("10.00"), stock=10, category=category)
+        self.shade = Product.objects.create(name="Shade", price=Decimal("2.50"), stock=10, category=category)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def totals(self):
+        cart = Cart.objects.get(user=self.user)
+        return cart.item_count, cart.subtotal
+
+    def add(self, product, quantity):
+        self.client.post(f"/api/store/cart/add/{product.pk}/", {"quantity": quantity}, format="json")
+
+    def test_totals_follow_adds_and_removes(self):
+        self.add(self.lamp, 2)
+        self.assertEqual(self.totals(), (2, Decimal("20.00")))
+
+        self.add(self.shade, 3)
+        self.add(self.lamp, 1)
+        self.assertEqual(self.totals(), (6, Decimal("37.50")))
+
+        self.client.delete(f"/api/store/cart/remove/{self.lamp.pk}/")
+        self.assertEqual(self.totals(), (3, Decimal("7.50")))
+
+    def test_totals_follow_checkout(self):
+        self.add(self.lamp, 2)
+        self.add(self.shade, 2)
+
+        self.client.post("/api/store/orders/checkout/selected/", {"product_ids": [self.lamp.pk]}, format="json")
+        self.assertEqual(self.totals(), (2, Decimal("5.00")))
+
+        self.client.post("/api/store/order/place/")
+        self.assertEqual(self.totals(), (0, Decimal("0.00")))
+
+    def test_totals_follow_price_changes(self):
+        self.add(self.lamp, 2)
+        self.add(self.shade, 1)
+
+        self.lamp.price = Decimal("12.00")
+        self.lamp.save()
+        self.assertEqual(self.totals(), (3, Decimal("26.50")))
+
+        self.shade.delete()
+        self.assertEqual(self.totals(), (2, Decimal("24.00")))
+
+    def test_summary_reports_the_stored_totals(self):
+        self.add(self.lamp, 2)
+
+        with self.assertNumQueries(1):
+            data = self.client.get("/api/store/cart/summary/").json()["data"]
+        self.assertEqual((data["item_count"], Decimal(data["subtotal"])), (2, Decimal("20.00")))
@@ -0,0 +1,59 @@
+"""
+Per-endpoint PostgreSQL statement timeouts.
+
+StatementTimeoutMiddleware records the timeout the current request wants
+(``STORE_STATEMENT_TIMEOUTS``, or None for the connection default) and
+apply_statement_timeout(), installed as an execute wrapper on every
+PostgreSQL connection, brings the session setting in line just before a
+query runs. So only the aliases a request actually queries are touched,
+streamed response bodies run under the same timeout as the view, and a
+``SET`` is only sent when the session's current value differs from the
+wanted one, which keeps back-to-back requests to the same kind of
+endpoint free of extra round trips.
+"""
+import contextvars
+import weakref
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+_timeout = contextvars.ContextVar("store_statement_timeout", default=None)
+
+# The statement_timeout last set on each raw connection, with connections
+# that were never changed (still at the default) absent. Keyed by the raw
+# connection so pooled connections keep their entry between checkouts.
+_applied = weakref.WeakKeyDictionary()
+
+# Set inside a transaction that may still roll back (and take the SET with it)
+UNKNOWN = object()
+
+
+def set_statement_timeout(timeout):
+    """Run this context's queries under ``timeout`` ms, or the default if None."""
+    _timeout.set(int(timeout) if timeout is not None else None)
+
+
+def apply_statement_timeout(execute, sql, params, many, context):
+    connection = context["connection"]
+    raw_connection = connection.connection
+    timeout = _timeout.get()
+    if _applied.get(raw_connection) != timeout and not connection.needs_rollback:
+        with raw_connection.cursor() as cursor:
+            if timeout is None:
+                cursor.execute("SET statement_timeout TO DEFAULT")
+            else:
+                cursor.execute(f"SET statement_timeout = {timeout}")
+        if connection.in_atomic_block:
+            _applied[raw_connection] = UNKNOWN
+        elif timeout is None:
+            _applied.pop(raw_connection, None)
+        else:
+            _applied[raw_connection] = timeout
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_statement_timeout(sender, connection, **kwargs):
+    if connection.vendor == "postgresql" and apply_statement_timeout not in connection.execute_wrappers:
+        connection.execute_wrappers.append(apply_statement_timeout)
@@ -1,9 +1,14 @@
 from django.urls import path
 from store.views import (
     AddToCartAPIView,
+    BatchAddToCartAPIView,
+    CartSummaryAPIView,
+    CategoryProductListAPIView,
     PlaceOrderAPIView,
     ProductDetailAPIView,
     ProductListAPIView,
+    ProductSearchAPIView,
+    ProductSlugDetailAPIView,
     ProductUpdateAPIView,
     RegisterAPIView,
     LoginAPIView,
@@ -16,40 +21,68 @@ from store.views import (
     CategoryListAPIView,
     CategoryUpdateAPIView,
     CategoryDeleteAPIView,
-    logout_user,
+    LogoutAPIView,
+    TokenRefreshAPIView,
     OrderCheckoutAPIView,
     OrderHistoryAPIView,
+    OrderExportAPIView,
 )
+from django.conf import settings
 from django.views.generic import TemplateView
 from django.views.generic.base import RedirectView
 
+from store.async_views import (
+    AsyncCategoryListAPIView,
+    AsyncProductDetailAPIView,
+    AsyncProductListAPIView,
+    AsyncViewCartAPIView,
+)
+
+# Serve the read-heavy endpoints from their ASGI-native variants
+if settings.STORE_ASYNC_VIEWS:
+    category_list_view = AsyncCategoryListAPIView
+    product_detail_view = AsyncProductDetailAPIView
+    product_list_view = AsyncProductListAPIView
+    view_cart_view = AsyncViewCartAPIView
+else:
+    category_list_view = CategoryListAPIView
+    product_detail_view = ProductDetailAPIView
+    product_list_view = ProductListAPIView
+    view_cart_view = ViewCartAPIView
+
 
 urlpatterns = [
     path('register/', RegisterAPIView.as_view(), name='register'),
     path('login/', LoginAPIView.as_view(), name='login'),
-    path('logout/', logout_user, name='logout'),
+    path('logout/', LogoutAPIView.as_view(), name='logout'),
+    path('token/refresh/', TokenRefreshAPIView.as_view(), name='token-refresh'),
 
     path('create/', ProductCreateAPIView.as_view(), name='product-create'),
-    path('product-list/', ProductListAPIView.as_view(), name='product-list'),
-    path('<int:pk>/', ProductDetailAPIView.as_view(), name='product-detail'),
+    path('product-list/', product_list_view.as_view(), name='product-list'),
+    path('products/search/', ProductSearchAPIView.as_view(), name='product-search'),
+    path('<int:pk>/', product_detail_view.as_view(), name='product-detail'),
+    path('product/<slug:slug>/', ProductSlugDetailAPIView.as_view(), name='product-slug-detail'),
+    path('category/<slug:slug>/products/', CategoryProductListAPIView.as_view(), name='category-products'),
     path('product/<int:pk>/update/', ProductUpdateAPIView.as_view(), name='update-product'),
     path('products/<int:pk>/delete/', ProductDeleteAPIView.as_view(), name='product-delete'),
 
     path('cart/add/<int:product_id>/', AddToCartAPIView.as_view(), name='add-to-cart'),
-    path('cart/', ViewCartAPIView.as_view(), name='view-cart'),
+    path('cart/add/', BatchAddToCartAPIView.as_view(), name='batch-add-to-cart'),
+    path('cart/', view_cart_view.as_view(), name='view-cart'),
+    path('cart/summary/', CartSummaryAPIView.as_view(), name='cart-summary'),
     path('cart/remove/<int:product_id>/', RemoveFromCartAPIView.as_view(), name='remove-from-cart'),
 
     path('order/place/', PlaceOrderAPIView.as_view(), name='place-order'),
 
     path('admin/category/create/', CreateCategoryAPIView.as_view(), name='admin-category-create'),
-    path('admin/category/list/', CategoryListAPIView.as_view(), name='admin-category-list'),
+    path('admin/category/list/', category_list_view.as_view(), name='admin-category-list'),
     path('admin/category/update/<int:pk>/', CategoryUpdateAPIView.as_view(), name='admin-category-update'),
     path('admin/category/delete/<int:pk>/', CategoryDeleteAPIView.as_view(), name='admin-category-delete'),
 
     path('orders/history/', OrderHistoryAPIView.as_view(), name='order-history'),
     path('orders/checkout/', OrderCheckoutAPIView.as_view(), name='order-checkout'),
     path('orders/checkout/selected/', SelectiveCheckoutAPIView.as_view(), name='selective-checkout'),
-    path('orders/history/', OrderHistoryAPIView.as_view(), name='order-history'),
+    path('admin/orders/export/', OrderExportAPIView.as_view(), name='admin-order-export'),
 
     path('', RedirectView.as_view(pattern_name='login-ui', permanent=False)),
 
@@ -1,30 +1,60 @@
-from decimal import Decimal
+import hashlib
+from decimal import Decimal, InvalidOperation
+from django.http import StreamingHttpResponse
 from django.shortcuts import redirect
 from django.views import View
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from rest_framework_simplejwt.tokens import RefreshToken
-from libs.response import APIResponse
-from store import STATUSCHOICES
-from store.models import Cart, CartItem, Category, Order, OrderItem, Product
+from libs.renderers import RawJSON, dumps
+from libs.response import APIResponse, StreamingAPIResponse
+from store.authentication import StoreRefreshToken
+from store.cache import catalog_cache, product_cache, product_slug_cache
+from store.categories import category_listing
+from store.conditional import CachePolicy, etag_condition
+from store.models import Cart, CartItem, Category, Order, Product, User
+from store.exporters import EXPORT_FORMATS, export_lines, order_lines, parse_export_filters
+from store.pagination import (
+    InvalidQueryParam,
+    KeysetPaginator,
+    get_page_number,
+    get_page_size,
+    get_stream_flag,
+)
+from store.passwords import HashingBusy, authenticate_user
+from store.revocation import token_denylist
+from store.search import search_products
 from store.permissions import IsAdminOrProductCreator, IsAdminUser
+from store.services import (
+    EmptyCart,
+    InsufficientStock,
+    add_to_cart,
+    checkout_cart,
+    increment_stock,
+    merge_lines,
+    refresh_cart_totals,
+)
 from store.serializers import (
+    BatchAddToCartSerializer,
     CategorySerializer,
     LoginSerializer,
     OrderSerializer,
     ProductCreateSerializer,
     ProductDetailSerializer,
     ProductListSerializer,
+    RefreshTokenSerializer,
     RegisterSerializer,
-    OrderHistorySerializer,
+    fast_order,
+    fast_product_detail,
+    fast_product_list,
 )
-from django.contrib.auth import authenticate
 from rest_framework.permissions import IsAuthenticated
-from django.db import transaction
+from django.db import DEFAULT_DB_ALIAS, transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
 
 # Create your views here.
@@ -32,12 +62,97 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from datetime import timedelta
 
 def get_tokens_for_user(user):
-    refresh = RefreshToken.for_user(user)
+    refresh = StoreRefreshToken.for_user(user)
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
     }
 
+
+def hashing_busy_response():
+    response = APIResponse(
+        success=False,
+        message="Too many login attempts in progress, please retry shortly.",
+        errors={
+            "code": "hashing_busy",
+            "message": "Password hashing capacity exhausted.",
+            "errors": {}
+        },
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    response["Retry-After"] = "1"
+    return response
+
+
+def product_list_etag(request):
+    # Filters, sort and cursor all live in the query string
+    query = hashlib.md5(request.META.get("QUERY_STRING", "").encode()).hexdigest()
+    return f"products-{catalog_cache.get_version('products')}-{query}"
+
+
+def category_products_etag(request, slug):
+    return f"{product_list_etag(request)}-{slug}"
+
+
+def product_detail_etag(request, pk):
+    return f"product-{pk}-{product_cache.get_version(pk)}"
+
+
+def load_product_id(slug):
+    return Product.objects.using(DEFAULT_DB_ALIAS).filter(slug=slug).values_list("id", flat=True).first()
+
+
+def product_id_for_slug(slug):
+    """Resolve a product slug through the product slug cache."""
+    return product_slug_cache.get_or_load(slug, load_product_id)
+
+
+def product_slug_etag(request, slug):
+    pk = product_id_for_slug(slug)
+    return product_detail_etag(request, pk) if pk is not None else f"product-slug-{slug}"
+
+
+def category_list_etag(request):
+    query = hashlib.md5(request.META.get("QUERY_STRING", "").encode()).hexdigest()
+    return f"categories-{catalog_cache.get_version('categories')}-{query}"
+
+
+def category_page_data(categories, number, size, total):
+    return {
+        "categories": categories,
+        "count": total,
+        "page": number,
+        "has_more": number * size < total,
+    }
+
+
+def invalid_query_response(exc, response_class=APIResponse):
+    """Report an InvalidQueryParam in the standard validation error format."""
+    return response_class(
+        success=False,
+        message="Invalid query parameters.",
+        errors={
+            "code": "validation_error",
+            "message": "Invalid query parameters.",
+            "errors": {exc.field: [exc.message]}
+        },
+        status_code=status.HTTP_400_BAD_REQUEST
+    )
+
+
+def insufficient_stock_response(exc):
+    """Report every short cart line from an InsufficientStock error at once."""
+    return APIResponse(
+        success=False,
+        message="Not enough stock available.",
+        errors={
+            "code": "insufficient_stock",
+            "message": "Some items do not have enough stock.",
+            "errors": exc.shortfalls
+        },
+        status_code=status.HTTP_400_BAD_REQUEST
+    )
+
 class RegisterAPIView(APIView):
     """
     API view for user registration.
@@ -48,7 +163,10 @@ class RegisterAPIView(APIView):
         # Validate the request data using the RegisterSerializer
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
+            try:
+                user = serializer.save()
+            except HashingBusy:
+                return hashing_busy_response()
             token = get_tokens_for_user(user)
 
             return APIResponse(
@@ -83,7 +201,10 @@ class LoginAPIView(APIView):
         if serializer.is_valid():
             email = serializer.validated_data['email']
             password = serializer.validated_data['password']
-            user = authenticate(email=email, password=password)
+            try:
+                user = authenticate_user(email, password)
+            except HashingBusy:
+                return hashing_busy_response()
 
             if user:
                 token = get_tokens_for_user(user)
@@ -116,12 +237,89 @@ class LoginAPIView(APIView):
             status_code=status.HTTP_400_BAD_REQUEST,
         )
 
-def logout_user(request):
+class LogoutAPIView(APIView):
+    """
+    API view for user logout.
+    POST revokes the access token used for the request and the refresh
+    token in the body, so neither can be used again. GET only redirects
+    to the login UI.
+    """
+    def get(self, request):
+        return redirect('/api/store/login-ui/')
+
+    def post(self, request):
+        if request.auth is not None:
+            token_denylist.revoke(request.auth)
+
+        serializer = RefreshTokenSerializer(data=request.data)
+        if serializer.is_valid():
+            try:
+                token_denylist.revoke(StoreRefreshToken(serializer.validated_data["refresh"]))
+            except TokenError:
+                # Expired or invalid refresh tokens are unusable already
+                pass
+
+        return APIResponse(
+            success=True,
+            message="Logout successful.",
+            data={},
+            status_code=status.HTTP_200_OK
+        )
+
+
+class TokenRefreshAPIView(APIView):
     """
-    Handles user logout by invalidating the JWT token.
-    Redirects to the login UI after successful logout.
+    Exchanges a refresh token for a new access and refresh token pair.
+    The presented refresh token is revoked, so each one works once; a
+    replayed refresh token is rejected.
     """
-    return redirect('/api/store/login-ui/')
+    def post(self, request):
+        serializer = RefreshTokenSerializer(data=request.data)
+        if not serializer.is_valid():
+            return APIResponse(
+                success=False,
+                message="Validation failed",
+                errors={
+                    "code": "validation_error",
+                    "message": "Invalid input data",
+                    "errors": serializer.errors
+                },
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            refresh = StoreRefreshToken(serializer.validated_data["refresh"])
+        except TokenError as exc:
+            return self.invalid_token_response(str(exc))
+
+        if not token_denylist.revoke(refresh):
+            return self.invalid_token_response("Token has been revoked")
+
+        user = User.objects.filter(pk=refresh[jwt_settings.USER_ID_CLAIM]).first()
+        if user is None or not user.is_active:
+            return self.invalid_token_response("User not found")
+
+        return APIResponse(
+            success=True,
+            message="Token refreshed successfully.",
+            data={
+                "token": get_tokens_for_user(user)
+            },
+            status_code=status.HTTP_200_OK
+        )
+
+    @staticmethod
+    def invalid_token_response(message):
+        return APIResponse(
+            success=False,
+            message="Token refresh failed.",
+            errors={
+                "code": "token_not_valid",
+                "message": message,
+                "errors": {}
+            },
+            status_code=status.HTTP_401_UNAUTHORIZED
+        )
 
 
 class ProductCreateAPIView(APIView):
@@ -162,20 +360,180 @@ class ProductCreateAPIView(APIView):
         )
 
 
+# sort param -> (field, descending); each is backed by a (field, id) index
+PRODUCT_SORT_OPTIONS = {
+    "id": ("id", False),
+    "-id": ("id", True),
+    "price": ("price", False),
+    "-price": ("price", True),
+    "name": ("name", False),
+    "-name": ("name", True),
+    "created_at": ("created_at", False),
+    "-created_at": ("created_at", True),
+}
+
+
+def get_product_paginator(params, category_id=None):
+    """
+    Build the filtered, sorted product paginator for the product list query
+    params, optionally limited to ``category_id``. Raises InvalidQueryParam
+    for bad input.
+    """
+    sort = params.get("sort", "id")
+    if sort not in PRODUCT_SORT_OPTIONS:
+        raise InvalidQueryParam("sort", f"Unsupported sort. Choose one of: {', '.join(PRODUCT_SORT_OPTIONS)}.")
+
+    products = Product.objects.all()
+    if category_id is not None:
+        products = products.filter(category_id=category_id)
+
+    category = params.get("category")
+    if category:
+        if category.isdigit():
+            products = products.filter(category_id=int(category))
+        else:
+            products = products.filter(category__slug=category)
+
+    for param, lookup in (("min_price", "price__gte"), ("max_price", "price__lte")):
+        value = params.get(param)
+        if value:
+            try:
+                number = Decimal(value)
+            except InvalidOperation:
+                number = None
+            # Decimal() also accepts NaN and Infinity
+            if number is None or not number.is_finite():
+                raise InvalidQueryParam(param, "Enter a valid number.")
+            products = products.filter(**{lookup: number})
+
+    if params.get("in_stock", "").lower() in ("1", "true", "yes"):
+        products = products.filter(stock__gt=0)
+
+    sort_field, descending = PRODUCT_SORT_OPTIONS[sort]
+    return KeysetPaginator(
+        fast_product_list.values(products, sort_field),
+        sort_field=sort_field,
+        descending=descending,
+        page_size=get_page_size(params.get("page_size")),
+    )
+
+
+def product_page_data(page):
+    return {
+        "products": fast_product_list.serialize(page.items),
+        "next_cursor": page.next_cursor,
+        "has_more": page.has_more,
+    }
+
+
+# The rest of a streamed list's data: it holds every remaining row
+STREAM_END = {"next_cursor": None, "has_more": False}
+
+
+def streamed_rows(paginator, serializer, cursor):
+    """
+    Serialized chunks of every row after ``cursor``, for a
+    StreamingAPIResponse. A bad cursor raises InvalidQueryParam here.
+    """
+    # Replica routing ends with the request, before the body is sent, so
+    # pick the database now
+    using = paginator.queryset.db
+    chunks = paginator.stream(cursor, using=using)
+    return (serializer.serialize(rows, using=using) for rows in chunks)
+
+
+def product_stream_response(chunks):
+    return StreamingAPIResponse(
+        "products", chunks, message="Product list fetched successfully.", extra=STREAM_END
+    )
+
+
 class ProductListAPIView(APIView):
     """
-    API view for listing all products.
-    Retrieves all products from the database and returns them in a serialized format.
+    API view for listing products.
+    Supports category, price range and in-stock filters and returns one
+    keyset-paginated page at a time; pass ``next_cursor`` back as ``cursor``
+    to fetch the following page. With ``stream=1`` every product after
+    ``cursor`` is streamed in one response instead.
     """
-    # TODO: Add pagination to the product list
+    cache_policy = CachePolicy.PUBLIC_REVALIDATE
+    read_from_replica = True
+
+    @etag_condition(product_list_etag)
     def get(self, request):
-        # Retrieve all products and serialize them
-        products = Product.objects.all()
-        serializer = ProductListSerializer(products, many=True)
+        params = request.query_params
+        try:
+            paginator = get_product_paginator(params)
+            if get_stream_flag(params.get("stream")):
+                return product_stream_response(streamed_rows(paginator, fast_product_list, params.get("cursor")))
+            page = paginator.paginate(params.get("cursor"))
+        except InvalidQueryParam as exc:
+            return invalid_query_response(exc)
+
+        return APIResponse(
+            success=True,
+            message="Product list fetched successfully.",
+            data=product_page_data(page),
+            status_code=status.HTTP_200_OK
+        )
+
+
+class CategoryProductListAPIView(APIView):
+    """
+    API view for listing the products of the category with ``slug``. Takes
+    the same query params as the product list; the slug is resolved from
+    the in-memory category listing, without a query.
+    """
+    cache_policy = CachePolicy.PUBLIC_REVALIDATE
+    read_from_replica = True
+
+    @etag_condition(category_products_etag)
+    def get(self, request, slug):
+        category_id = category_listing.id_for_slug(slug)
+        if category_id is None:
+            return APIResponse(
+                success=False,
+                message="Category not found.",
+                status_code=status.HTTP_404_NOT_FOUND,
+                data={}
+            )
+
+        params = request.query_params
+        try:
+            paginator = get_product_paginator(params, category_id=category_id)
+            if get_stream_flag(params.get("stream")):
+                return product_stream_response(streamed_rows(paginator, fast_product_list, params.get("cursor")))
+            page = paginator.paginate(params.get("cursor"))
+        except InvalidQueryParam as exc:
+            return invalid_query_response(exc)
 
         return APIResponse(
             success=True,
             message="Product list fetched successfully.",
+            data=product_page_data(page),
+            status_code=status.HTTP_200_OK
+        )
+
+
+class ProductSearchAPIView(APIView):
+    """
+    API view for full-text product search over name and description.
+    The last word of ``q`` is matched as a prefix; results are ranked.
+    """
+    cache_policy = CachePolicy.PUBLIC_REVALIDATE
+
+    @etag_condition(product_list_etag)
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return invalid_query_response(InvalidQueryParam("q", "This parameter is required."))
+
+        products = search_products(query, get_page_size(request.query_params.get("page_size")))
+        serializer = ProductListSerializer(products, many=True)
+
+        return APIResponse(
+            success=True,
+            message="Product search completed successfully.",
             data={
                 "products": serializer.data
             },
@@ -183,12 +541,30 @@ class ProductListAPIView(APIView):
         )
 
 
+def product_detail_rows(pk):
+    """The product detail payload row, as fast_product_detail expects it."""
+    # Cache fills always read the primary: a lagging replica would pin an
+    # old row to the version a write has just bumped
+    return fast_product_detail.values(Product.objects.using(DEFAULT_DB_ALIAS).filter(pk=pk))
+
+
 class ProductDetailAPIView(APIView):
-    """ API view for retrieving product details."""
+    """
+    API view for retrieving product details.
+    Details are served from the product cache, already encoded, and only
+    loaded from the database on a miss; writes to the product or its
+    category invalidate it.
+    """
+    cache_policy = CachePolicy.PUBLIC_REVALIDATE
+    read_from_replica = True
+
+    @etag_condition(product_detail_etag)
     def get(self, request, pk):
-        try:
-            product = Product.objects.get(pk=pk)
-        except Product.DoesNotExist:
+        return self.product_response(pk)
+
+    def product_response(self, pk):
+        product_json = product_cache.get_or_load(pk, self.load_product) if pk is not None else None
+        if product_json is None:
             return APIResponse(
                 success=False,
                 message="Product not found.",
@@ -196,24 +572,28 @@ class ProductDetailAPIView(APIView):
                 data={}
             )
 
-        serializer = ProductDetailSerializer(product)
-        filtered_data = {
-            "id": serializer.data["id"],
-            "name": serializer.data["name"],
-            "price": serializer.data["price"],
-            "stock": serializer.data["stock"],
-            "description": serializer.data["description"],
-            "category": serializer.data["category_name"],
-            "image": serializer.data["image"]
-        }
-
         return APIResponse(
             success=True,
             message="Product fetched successfully.",
-            data={"product": filtered_data},
+            data={"product": RawJSON(product_json)},
             status_code=status.HTTP_200_OK
         )
 
+    @staticmethod
+    def load_product(pk):
+        row = product_detail_rows(pk).first()
+        return dumps(fast_product_detail.serialize_one(row)) if row else None
+
+
+class ProductSlugDetailAPIView(ProductDetailAPIView):
+    """
+    API view for retrieving product details by slug. The slug is resolved
+    through the product slug cache, then served like ProductDetailAPIView.
+    """
+    @etag_condition(product_slug_etag)
+    def get(self, request, slug):
+        return self.product_response(product_id_for_slug(slug))
+
 
 class ProductUpdateAPIView(APIView):
     """
@@ -302,12 +682,13 @@ class ProductDeleteAPIView(APIView):
 class AddToCartAPIView(APIView):
     """
     API view for adding a product to the cart.
+    Adding a product that is already in the cart increases its quantity.
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, product_id):
         try:
-            product = Product.objects.get(id=product_id)
+            product = Product.objects.only("id", "name").get(id=product_id)
         except Product.DoesNotExist:
             return Response(
                 {
@@ -316,11 +697,24 @@ class AddToCartAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        try:
+            quantity = int(request.data.get("quantity", 1))
+        except (TypeError, ValueError):
+            quantity = 0
+        if quantity < 1:
+            return Response(
+                {
+                    "error": "Quantity must be a positive integer"
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         cart, _ = Cart.objects.get_or_create(user=request.user)
-        quantity = int(request.data.get("quantity", 1))
 
-        # Check stock availability
-        if product.stock < quantity:
+        # Reserve stock and upsert the cart line in one transaction
+        try:
+            quantities = add_to_cart(cart, {product.id: quantity})
+        except InsufficientStock:
             return Response(
                 {
                     "error": "Not enough stock available"
@@ -328,21 +722,10 @@ class AddToCartAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create cart item
-        cart_item = CartItem.objects.create(
-            cart=cart,
-            product=product,
-            quantity=quantity
-        )
-
-        # Decrease product stock
-        product.stock -= quantity
-        product.save()
-
         cart_data = {
             "product_id": product.id,
             "product_name": product.name,
-            "quantity": cart_item.quantity,
+            "quantity": quantities[product.id],
         }
 
         return APIResponse(
@@ -355,6 +738,95 @@ class AddToCartAPIView(APIView):
         )
 
 
+class BatchAddToCartAPIView(APIView):
+    """
+    API view for adding many products to the cart at once.
+    Either every line is added or, if any is short of stock, none is.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = BatchAddToCartSerializer(data=request.data)
+        if not serializer.is_valid():
+            return APIResponse(
+                success=False,
+                message="Validation failed",
+                errors={
+                    "code": "validation_error",
+                    "message": "Invalid input data",
+                    "errors": serializer.errors
+                },
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        lines = merge_lines(
+            (line["product_id"], line["quantity"]) for line in serializer.validated_data["items"]
+        )
+        cart, _ = Cart.objects.get_or_create(user=request.user)
+
+        try:
+            quantities = add_to_cart(cart, lines)
+        except InsufficientStock as exc:
+            return insufficient_stock_response(exc)
+
+        names = dict(Product.objects.filter(pk__in=lines).values_list("id", "name"))
+        cart_data = [
+            {
+                "product_id": product_id,
+                "product_name": names.get(product_id),
+                "quantity": quantities[product_id],
+            }
+            for product_id in lines
+        ]
+
+        return APIResponse(
+            success=True,
+            message="Products added to cart successfully.",
+            data={
+                "cart_items": cart_data
+            },
+            status_code=status.HTTP_201_CREATED
+        )
+
+
+def cart_line_data(item):
+    return {
+        "product_id": item.product.id,
+        "product": item.product.name,
+        "quantity": item.quantity,
+        "price": str(item.product.price),
+        "total": str(item.quantity * item.product.price),
+        "image": item.product.image.url if item.product.image else None,
+    }
+
+
+EMPTY_CART_TOTALS = {"item_count": 0, "subtotal": "0.00"}
+
+
+def cart_totals_data(cart):
+    return {
+        "item_count": cart.item_count,
+        "subtotal": str(cart.subtotal),
+    }
+
+
+class CartSummaryAPIView(APIView):
+    """
+    API view for the cart badge: item count and subtotal, read from the
+    totals stored on the cart in a single query.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        cart = Cart.objects.filter(user=request.user).only("item_count", "subtotal").first()
+        return APIResponse(
+            success=True,
+            message="Cart summary fetched successfully.",
+            data=cart_totals_data(cart) if cart else EMPTY_CART_TOTALS,
+            status_code=status.HTTP_200_OK
+        )
+
+
 class ViewCartAPIView(APIView):
     """API view for viewing the user's cart."""
     permission_classes = [permissions.IsAuthenticated]
@@ -367,29 +839,21 @@ class ViewCartAPIView(APIView):
                 success=True,
                 message="Cart fetched successfully.",
                 data={
-                    "cart": []
+                    "cart": [],
+                    **EMPTY_CART_TOTALS
                 },
                 status_code=status.HTTP_200_OK
             )
 
-        items = CartItem.objects.filter(cart=cart)
-        cart_data = [
-            {
-                "product_id": item.product.id,
-                "product": item.product.name,
-                "quantity": item.quantity,
-                "price": str(item.product.price),
-                "total": str(item.quantity * item.product.price),
-                "image": item.product.image.url if item.product.image else None,
-            }
-            for item in items
-        ]
+        items = CartItem.objects.filter(cart=cart).select_related("product")
+        cart_data = [cart_line_data(item) for item in items]
 
         return APIResponse(
             success=True,
             message="Cart fetched successfully.",
             data={
-                "cart": cart_data
+                "cart": cart_data,
+                **cart_totals_data(cart)
             },
             status_code=status.HTTP_200_OK
         )
@@ -412,13 +876,13 @@ class RemoveFromCartAPIView(APIView):
                     data={}
                 )
 
-            # Restore product stock
-            product = cart_item.product
-            product.stock += cart_item.quantity
-            product.save()
+            with transaction.atomic():
+                # Restore product stock
+                increment_stock({cart_item.product_id: cart_item.quantity})
 
-            # Delete the cart item
-            cart_item.delete()
+                # Delete the cart item
+                cart_item.delete()
+                refresh_cart_totals([cart.pk])
 
             return APIResponse(
                 success=True,
@@ -442,7 +906,6 @@ class PlaceOrderAPIView(APIView):
     """
     permission_classes = [IsAuthenticated]
 
-    @transaction.atomic
     def post(self, request):
         user = request.user
 
@@ -456,8 +919,9 @@ class PlaceOrderAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        cart_items = CartItem.objects.filter(cart=cart)
-        if not cart_items.exists():
+        try:
+            order = checkout_cart(cart, user)
+        except EmptyCart:
             return Response(
                 {
                     "error": "Cart has no items"
@@ -465,55 +929,6 @@ class PlaceOrderAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        total_amount = 0
-        order_items_data = []
-
-        # Step 1: Check stock availability
-        for item in cart_items:
-            if item.product.stock < item.quantity:
-                return Response(
-                    {
-                        "error": f"Not enough stock for {item.product.name}. Available: {item.product.stock}"
-                    },
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-        # Step 2: Create Order
-        order = Order.objects.create(
-            user=user,
-            total_amount=0,
-            status="PENDING",
-            created_by=user.email,
-            updated_by=user.email
-        )
-
-        # Step 3: Create OrderItems and deduct stock
-        for item in cart_items:
-            price = item.product.price
-            quantity = item.quantity
-            subtotal = price * quantity
-            total_amount += subtotal
-
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                quantity=quantity,
-                price_at_order_time=price,
-                created_by=user.email,
-                updated_by=user.email
-            )
-
-            # Deduct stock
-            item.product.stock -= quantity
-            item.product.save()
-
-        # Update total amount
-        order.total_amount = total_amount
-        order.save()
-
-        # Step 4: Clear cart
-        cart_items.delete()
-
         return APIResponse(
             success=True,
             message="Order placed successfully.",
@@ -563,31 +978,26 @@ class CreateCategoryAPIView(APIView):
 
 
 class CategoryListAPIView(APIView):
-    """API view for listing all categories."""
-     # TODO: Add pagination to the category list
+    """
+    API view for listing categories with their product and in-stock counts,
+    one page at a time. Served from the process-local category listing.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    cache_policy = CachePolicy.PRIVATE_REVALIDATE
 
+    @etag_condition(category_list_etag)
     def get(self, request):
-        categories = Category.objects.all()
-        serializer = CategorySerializer(
-            categories,
-            many=True
-        )
-
-        formatted_data = [
-            {
-                "id": category["id"],
-                "name": category["name"],
-                "slug": category["slug"]
-            } for category in serializer.data
-        ]
+        try:
+            number = get_page_number(request.query_params.get("page"))
+        except InvalidQueryParam as exc:
+            return invalid_query_response(exc)
+        size = get_page_size(request.query_params.get("page_size"))
+        categories, total = category_listing.page(number, size)
 
         return APIResponse(
             success=True,
             message="Category list fetched successfully.",
-            data={
-                "categories": formatted_data
-            },
+            data=category_page_data(categories, number, size, total),
             status_code=status.HTTP_200_OK
         )
 
@@ -610,9 +1020,7 @@ class CategoryUpdateAPIView(APIView):
 
         serializer = CategorySerializer(category, data=request.data, partial=True)
         if serializer.is_valid():
-            updated_category = serializer.save()
-            updated_category.updated_by = request.user.email
-            updated_category.save()
+            updated_category = serializer.save(updated_by=request.user.email)
 
             filtered_data = {
                 "id": updated_category.id,
@@ -661,34 +1069,6 @@ class CategoryDeleteAPIView(APIView):
         )
 
 
-class OrderHistoryAPIView(APIView):
-    """
-    Returns the list of past orders for the authenticated user.
-    """
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        orders = Order.objects.filter(
-            user=request.user
-        ).order_by(
-            '-ordered_at'
-        )
-
-        serializer = OrderHistorySerializer(
-            orders, 
-            many=True
-        )
-
-        return APIResponse(
-            success=True,
-            message="Order history fetched successfully.",
-            data={
-                "orders": serializer.data
-            },
-            status_code=status.HTTP_200_OK
-        )
-
-
 class OrderCheckoutAPIView(APIView):
     """
     Converts cart into order, clears cart, and returns order summary.
@@ -698,7 +1078,8 @@ class OrderCheckoutAPIView(APIView):
     def post(self, request):
         try:
             cart = Cart.objects.get(user=request.user)
-        except Cart.DoesNotExist:
+            order = checkout_cart(cart, request.user)
+        except (Cart.DoesNotExist, EmptyCart):
             return APIResponse(
                 success=False,
                 message="Cart is empty.",
@@ -706,41 +1087,7 @@ class OrderCheckoutAPIView(APIView):
                 data={}
             )
 
-        cart_items = CartItem.objects.filter(cart=cart)
-        if not cart_items.exists():
-            return APIResponse(
-                success=False,
-                message="Cart is empty.",
-                status_code=status.HTTP_400_BAD_REQUEST,
-                data={}
-            )
-
-        total_amount = Decimal('0.00')
-        for item in cart_items:
-            total_amount += item.product.price * item.quantity
-
-        # Create Order
-        order = Order.objects.create(
-            user=request.user,
-            total_amount=total_amount,
-            status=STATUSCHOICES.PENDING
-        )
-
-        # Create OrderItems and update stock
-        for item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                quantity=item.quantity,
-                price_at_order_time=item.product.price
-            )
-            item.product.stock -= item.quantity
-            item.product.save()
-
-        # Clear cart
-        cart_items.delete()
-
-        serializer = OrderSerializer(order)
+        serializer = OrderSerializer(Order.objects.with_items().get(pk=order.pk))
         return APIResponse(
             success=True,
             message="Order placed successfully.",
@@ -776,45 +1123,17 @@ class SelectiveCheckoutAPIView(APIView):
                 status_code=status.HTTP_404_NOT_FOUND
             )
 
-        cart_items = CartItem.objects.filter(
-            cart=cart,
-            product_id__in=product_ids
-        )
-
-        if not cart_items.exists():
+        try:
+            # Only the checked-out items are removed from the cart
+            order = checkout_cart(cart, request.user, product_ids=product_ids)
+        except EmptyCart:
             return APIResponse(
                 success=False,
                 message="No matching items found in cart.",
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
-        total_amount = Decimal("0.00")
-        for item in cart_items:
-            total_amount += item.product.price * item.quantity
-
-        # Create order
-        order = Order.objects.create(
-            user=request.user,
-            total_amount=total_amount,
-            status=STATUSCHOICES.PENDING
-        )
-
-        for item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                quantity=item.quantity,
-                price_at_order_time=item.product.price
-            )
-
-            # Reduce stock
-            item.product.stock -= item.quantity
-            item.product.save()
-
-        # Remove only the checked-out items
-        cart_items.delete()
-
-        serializer = OrderSerializer(order)
+        serializer = OrderSerializer(Order.objects.with_items().get(pk=order.pk))
         return APIResponse(
             success=True,
             message="Selected items checked out successfully.",
@@ -827,24 +1146,70 @@ class SelectiveCheckoutAPIView(APIView):
 
 class OrderHistoryAPIView(APIView):
     """
-    Returns the list of past orders for the authenticated user.
+    Returns the authenticated user's past orders, newest first, one
+    cursor-paginated page at a time with each order's line items.
+    ``stream=1`` streams every order after ``cursor`` in one response.
     """
     permission_classes = [IsAuthenticated]
+    read_from_replica = True
 
     def get(self, request):
-        orders = Order.objects.filter(
-            user=request.user
-        ).order_by(
-            '-ordered_at'
+        # The items of the whole page, with product names, are one more query
+        orders = fast_order.values(Order.objects.filter(user=request.user))
+
+        paginator = KeysetPaginator(
+            orders,
+            sort_field="ordered_at",
+            descending=True,
+            page_size=get_page_size(request.query_params.get("page_size")),
         )
-
-        serializer = OrderSerializer(orders, many=True)
+        cursor = request.query_params.get("cursor")
+        try:
+            if get_stream_flag(request.query_params.get("stream")):
+                return StreamingAPIResponse(
+                    "orders",
+                    streamed_rows(paginator, fast_order, cursor),
+                    message="Order history fetched successfully.",
+                    extra=STREAM_END,
+                )
+            page = paginator.paginate(cursor)
+        except InvalidQueryParam as exc:
+            return invalid_query_response(exc)
 
         return APIResponse(
             success=True,
             message="Order history fetched successfully.",
             data={
-                "orders": serializer.data
+                "orders": fast_order.serialize(page.items),
+                "next_cursor": page.next_cursor,
+                "has_more": page.has_more,
             },
             status_code=status.HTTP_200_OK
         )
+
+
+class OrderExportAPIView(APIView):
+    """
+    Streams every order line matching the ``from``/``to`` date range and
+    ``status`` filters as CSV (default) or JSON Lines (``output=jsonl``).
+    Memory use stays flat however many lines are exported.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        # Not "format": DRF reserves it for renderer selection
+        output = request.query_params.get("output", "csv")
+        try:
+            if output not in EXPORT_FORMATS:
+                raise InvalidQueryParam("output", f"Choose one of: {', '.join(EXPORT_FORMATS)}.")
+            filters = parse_export_filters(request.query_params)
+        except InvalidQueryParam as exc:
+            return invalid_query_response(exc)
+
+        content_type = "text/csv" if output == "csv" else "application/x-ndjson"
+        response = StreamingHttpResponse(
+            export_lines(order_lines(**filters), output),
+            content_type=f"{content_type}; charset=utf-8"
+        )
+        response["Content-Disposition"] = f'attachment; filename="order-lines.{output}"'
+        return response